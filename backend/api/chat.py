@@ -1,9 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import os
 import json
 import base64
 import uuid
-from services.llm_service import LLMService
+from services.llm_service import LLMService, serialize_history_entry
 
 # Initialize Blueprint
 chat_bp = Blueprint('chat', __name__)
@@ -84,6 +84,50 @@ def send_message():
             'error': str(e)
         }), 500
 
+@chat_bp.route('/stream', methods=['POST'])
+def stream_message():
+    """
+    Endpoint for sending a message to the chat and streaming the response
+    
+    Request body: same as /send
+    
+    Response (text/event-stream), one JSON event per message:
+    data: {"type": "text", "text": "chunk of the assistant response"}
+    ...
+    data: {
+        "type": "done",
+        "conversation_id": "conversation-id",
+        "context": {...},
+        "next_step": "specification" | "continue" | null
+    }
+    """
+    data = request.get_json()
+    
+    if not data or 'message' not in data:
+        return jsonify({
+            'error': 'Invalid request. Message is required.'
+        }), 400
+    
+    events = llm_service.stream_chat_message(
+        data['message'],
+        data.get('conversation_id'),
+        data.get('context', {}),
+        data.get('files', [])
+    )
+    
+    def generate():
+        try:
+            for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @chat_bp.route('/history/<conversation_id>', methods=['GET'])
 def get_conversation_history(conversation_id):
     """
@@ -109,16 +153,10 @@ def get_conversation_history(conversation_id):
     try:
         history, context = llm_service.get_conversation_history(conversation_id)
         
-        # Remove binary data from the response to keep it lightweight
-        for message in history:
-            if 'files' in message:
-                # Keep file metadata but remove binary data
-                for file in message['files']:
-                    if 'data' in file:
-                        file['data'] = '[BINARY DATA]'
-        
+        # Serialize timestamps and remove binary data from the response to keep it
+        # lightweight, without touching the stored conversation
         return jsonify({
-            'history': history,
+            'history': [serialize_history_entry(message) for message in history],
             'context': context
         })
         
@@ -127,6 +165,29 @@ def get_conversation_history(conversation_id):
             'error': str(e)
         }), 500
 
+@chat_bp.route('/status', methods=['GET'])
+def get_status():
+    """
+    Endpoint for checking the LLM service
+    
+    Response:
+    {
+        "configured": true,
+        "api_key_valid": true | false | null,
+        "circuit_open": false,
+        "cache": {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "size": 0
+        }
+    }
+    """
+    return jsonify({
+        **llm_service.get_status(),
+        'cache': llm_service.get_cache_stats()
+    })
+
 @chat_bp.route('/upload', methods=['POST'])
 def upload_file():
     """
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response
 import os
 import json
 import tempfile
@@ -75,6 +75,9 @@ def get_generation_status(generation_id):
         "message": "Optional status message",
         "error": "Optional error message if status is failed"
     }
+    
+    The response carries an ETag that changes with every update; polling
+    clients sending it back in If-None-Match get a 304 until something changes.
     """
     try:
         status_info = module_generator_service.get_generation_status(generation_id)
@@ -84,7 +87,14 @@ def get_generation_status(generation_id):
                 'error': 'Generation ID not found.'
             }), 404
         
-        return jsonify(status_info)
+        etag = f"{generation_id}-{status_info.get('updated_at')}"
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = jsonify(status_info)
+        response.set_etag(etag)
+        
+        return response
         
     except Exception as e:
         return jsonify({
@@ -0,0 +1 @@
+# Makes the backend packages (services, api) importable from tests/
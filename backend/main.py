@@ -1,4 +1,5 @@
 import os
+import logging
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
@@ -12,6 +13,13 @@ from api.module_generator import module_generator_bp
 # Load environment variables
 load_dotenv()
 
+# Configure logging; replaces the default set up when the services are imported
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+    force=True
+)
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
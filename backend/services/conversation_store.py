@@ -0,0 +1,160 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+
+# orjson is a faster drop-in for the encoding done here; fall back to json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+@dataclass(slots=True)
+class Turn:
+    """
+    Single message of a conversation history
+    """
+    role: str
+    content: str
+    ts_ns: int
+    files: tuple = ()
+    
+    def to_dict(self):
+        """
+        Convert the turn to a serializable dict
+        
+        Returns:
+            dict: Turn with its files as a list, omitted when there are none
+        """
+        data = {
+            'role': self.role,
+            'content': self.content,
+            'ts_ns': self.ts_ns
+        }
+        
+        if self.files:
+            data['files'] = list(self.files)
+        
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a turn from its serialized dict
+        
+        Args:
+            data (dict): Turn as returned by to_dict
+            
+        Returns:
+            Turn: Conversation turn
+        """
+        return cls(data['role'], data['content'], data['ts_ns'], tuple(data.get('files', ())))
+
+class RedisConversationStore:
+    """
+    Conversation store shared by all worker processes through Redis
+    
+    Supports the mapping operations LLMService uses on its conversation store
+    (get and item assignment). Each conversation is a Redis hash with its
+    history, context and images as separate fields, expiring after the TTL.
+    Images are stored once per conversation and referenced from history
+    entries by hash.
+    """
+    
+    available = redis is not None
+    
+    def __init__(self, url, ttl, history_max_entries):
+        """
+        Initialize the store
+        
+        Args:
+            url (str): Redis URL
+            ttl (int): Seconds a conversation is kept after its last update
+            history_max_entries (int): Maximum number of history entries kept
+        """
+        self.redis = redis.Redis.from_url(url, decode_responses=False)
+        self.ttl = ttl
+        self.history_max_entries = history_max_entries
+    
+    def _key(self, conversation_id):
+        return f"conv:{conversation_id}"
+    
+    def get(self, conversation_id, default=None):
+        """
+        Load a conversation
+        
+        Args:
+            conversation_id (str): Conversation ID
+            default: Value returned when the conversation does not exist
+        
+        Returns:
+            dict: Conversation with 'history', 'context' and 'images'
+        """
+        fields = self.redis.hgetall(self._key(conversation_id))
+        if not fields:
+            return default
+        
+        images = _loads(fields[b'images'])
+        history = deque(maxlen=self.history_max_entries)
+        for data in _loads(fields[b'history']):
+            turn = Turn.from_dict(data)
+            if turn.files:
+                turn.files = tuple(
+                    {**file, 'data': images[file['data_ref']]} if 'data_ref' in file else file
+                    for file in turn.files
+                )
+            history.append(turn)
+        
+        return {
+            'history': history,
+            'context': _loads(fields[b'context']),
+            'images': images
+        }
+    
+    def __setitem__(self, conversation_id, conversation):
+        """
+        Save a conversation and reset its expiry
+        
+        Args:
+            conversation_id (str): Conversation ID
+            conversation (dict): Conversation with 'history', 'context' and 'images'
+        """
+        # Images are saved once in their own field; entries keep only the
+        # reference, and images no longer in the history are dropped
+        history = []
+        images = {}
+        for turn in conversation['history']:
+            data = turn.to_dict()
+            if turn.files:
+                files = []
+                for file in turn.files:
+                    if 'data_ref' in file:
+                        images[file['data_ref']] = file['data']
+                        file = {key: value for key, value in file.items() if key != 'data'}
+                    files.append(file)
+                data['files'] = files
+            history.append(data)
+        
+        key = self._key(conversation_id)
+        pipeline = self.redis.pipeline()
+        pipeline.hset(key, mapping={
+            'history': _dumps(history),
+            'context': _dumps(conversation['context']),
+            'images': _dumps(images)
+        })
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
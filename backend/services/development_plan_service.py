@@ -1,10 +1,91 @@
 import os
 import json
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 from services.llm_service import LLMService
 from services.specification_service import SpecificationService
 
+# Prompt templates, built once at import time and filled with str.format
+PLAN_PROMPT_TEMPLATE = """
+        Based on the following Odoo module specification, generate a detailed development plan.
+        The plan should include:
+        
+        1. Module Structure: A list of files and directories that will be created
+        2. Development Steps: A step-by-step plan for implementing the module
+        
+        Module Specification:
+        {specification}"""
+
+UPDATE_PROMPT_TEMPLATE = """
+        Update the following Odoo module development plan based on the user feedback.
+        
+        Module Specification:
+        {specification}
+
+Current Development Plan:
+{current_plan}
+
+User Feedback:
+{feedback}
+        
+        Provide the complete updated development plan in the same format as the current plan.
+        """
+
+@dataclass(slots=True)
+class PlanRecord:
+    """
+    Stored development plan with its tracking metadata
+    """
+    plan: dict
+    specification_id: str
+    created_at: str
+    updated_at: str
+    status: str
+    approved_at: Optional[str] = None
+    
+    def to_dict(self):
+        """
+        Convert the record to the dict format used in plan files
+        
+        Returns:
+            dict: Serializable plan record
+        """
+        data = {
+            'plan': self.plan,
+            'specification_id': self.specification_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'status': self.status
+        }
+        
+        if self.approved_at is not None:
+            data['approved_at'] = self.approved_at
+        
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a record from the dict format used in plan files
+        
+        Args:
+            data (dict): Plan record loaded from a file
+            
+        Returns:
+            PlanRecord: Plan record
+        """
+        return cls(
+            plan=data['plan'],
+            specification_id=data['specification_id'],
+            created_at=data['created_at'],
+            updated_at=data['updated_at'],
+            status=data['status'],
+            approved_at=data.get('approved_at')
+        )
+
 class DevelopmentPlanService:
     """
     Service for generating and managing development plans
@@ -17,8 +98,13 @@ class DevelopmentPlanService:
         self.llm_service = LLMService()
         self.specification_service = SpecificationService()
         
-        # In-memory storage for development plans (in a real implementation, this would be a database)
-        self.plans = {}
+        # Per-process LRU of development plans. The plan files are the store
+        # shared between worker processes; each cached record remembers the
+        # file mtime it was read or written at, so updates made by another
+        # worker are picked up on the next access.
+        self.plans = OrderedDict()
+        self._plan_mtimes = {}
+        self._plans_cache_size = 256
         
         # Create data directory if it doesn't exist
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'plans')
@@ -50,16 +136,17 @@ class DevelopmentPlanService:
         plan = self._generate_plan_with_llm(prompt, specification)
         
         # Store the plan
-        self.plans[plan_id] = {
-            'plan': plan,
-            'specification_id': specification_id,
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
-            'status': 'draft'
-        }
+        now = datetime.now().isoformat()
+        record = PlanRecord(
+            plan=plan,
+            specification_id=specification_id,
+            created_at=now,
+            updated_at=now,
+            status='draft'
+        )
         
         # Save the plan to a file
-        self._save_plan(plan_id)
+        self._save_plan(plan_id, record)
         
         return plan_id, plan
     
@@ -73,12 +160,12 @@ class DevelopmentPlanService:
         Returns:
             dict: Development plan
         """
-        if plan_id not in self.plans:
-            # Try to load from file
-            if not self._load_plan(plan_id):
-                return None
+        record = self._get_record(plan_id)
+        
+        if record is None:
+            return None
         
-        return self.plans[plan_id]['plan']
+        return record.plan
     
     def update_plan(self, plan_id, feedback):
         """
@@ -91,15 +178,14 @@ class DevelopmentPlanService:
         Returns:
             dict: Updated development plan
         """
-        if plan_id not in self.plans:
-            # Try to load from file
-            if not self._load_plan(plan_id):
-                raise ValueError(f"Development plan not found: {plan_id}")
+        record = self._get_record(plan_id)
+        
+        if record is None:
+            raise ValueError(f"Development plan not found: {plan_id}")
         
         # Get the current plan
-        plan_data = self.plans[plan_id]
-        current_plan = plan_data['plan']
-        specification_id = plan_data['specification_id']
+        current_plan = record.plan
+        specification_id = record.specification_id
         
         # Get the specification
         specification = self.specification_service.get_specification(specification_id)
@@ -111,11 +197,11 @@ class DevelopmentPlanService:
         updated_plan = self._update_plan_with_llm(prompt, current_plan)
         
         # Update the plan
-        self.plans[plan_id]['plan'] = updated_plan
-        self.plans[plan_id]['updated_at'] = datetime.now().isoformat()
+        record.plan = updated_plan
+        record.updated_at = datetime.now().isoformat()
         
         # Save the updated plan to a file
-        self._save_plan(plan_id)
+        self._save_plan(plan_id, record)
         
         return updated_plan
     
@@ -126,42 +212,73 @@ class DevelopmentPlanService:
         Args:
             plan_id (str): Plan ID
         """
-        if plan_id not in self.plans:
-            # Try to load from file
-            if not self._load_plan(plan_id):
-                raise ValueError(f"Development plan not found: {plan_id}")
+        record = self._get_record(plan_id)
+        
+        if record is None:
+            raise ValueError(f"Development plan not found: {plan_id}")
         
         # Update the status
-        self.plans[plan_id]['status'] = 'approved'
-        self.plans[plan_id]['approved_at'] = datetime.now().isoformat()
+        record.status = 'approved'
+        record.approved_at = datetime.now().isoformat()
         
         # Save the updated plan to a file
-        self._save_plan(plan_id)
+        self._save_plan(plan_id, record)
     
-    def _prepare_plan_prompt(self, specification):
+    def _get_record(self, plan_id):
         """
-        Prepare the prompt for generating a development plan
+        Get a plan record, reloading it from its file when another process changed it
         
         Args:
-            specification (dict): Module specification
+            plan_id (str): Plan ID
             
         Returns:
-            str: Formatted prompt
+            PlanRecord: Plan record, or None if not found
         """
-        prompt = """
-        Based on the following Odoo module specification, generate a detailed development plan.
-        The plan should include:
+        record = self.plans.get(plan_id)
         
-        1. Module Structure: A list of files and directories that will be created
-        2. Development Steps: A step-by-step plan for implementing the module
+        try:
+            mtime = os.stat(os.path.join(self.data_dir, f"{plan_id}.json")).st_mtime_ns
+        except OSError:
+            # Without a file there is nothing newer to load
+            return record
         
-        Module Specification:
+        if record is not None and self._plan_mtimes.get(plan_id) == mtime:
+            self.plans.move_to_end(plan_id)
+            return record
+        
+        # Try to load from file
+        return self._load_plan(plan_id)
+    
+    def _cache_plan(self, plan_id, record, mtime):
         """
+        Keep a plan record in the per-process LRU
         
-        # Add specification to the prompt
-        prompt += json.dumps(specification, indent=2)
+        Args:
+            plan_id (str): Plan ID
+            record (PlanRecord): Plan record
+            mtime (int): Modification time of the plan file in nanoseconds
+        """
+        self.plans[plan_id] = record
+        self.plans.move_to_end(plan_id)
+        self._plan_mtimes[plan_id] = mtime
         
-        return prompt
+        while len(self.plans) > self._plans_cache_size:
+            evicted_id, _ = self.plans.popitem(last=False)
+            self._plan_mtimes.pop(evicted_id, None)
+    
+    def _prepare_plan_prompt(self, specification):
+        """
+        Prepare the prompt for generating a development plan
+        
+        Args:
+            specification (dict): Module specification
+            
+        Returns:
+            str: Formatted prompt
+        """
+        return PLAN_PROMPT_TEMPLATE.format(
+            specification=json.dumps(specification, indent=2)
+        )
     
     def _prepare_update_prompt(self, current_plan, specification, feedback):
         """
@@ -175,26 +292,11 @@ class DevelopmentPlanService:
         Returns:
             str: Formatted prompt
         """
-        prompt = """
-        Update the following Odoo module development plan based on the user feedback.
-        
-        Module Specification:
-        """
-        
-        # Add specification to the prompt
-        prompt += json.dumps(specification, indent=2)
-        
-        prompt += "\n\nCurrent Development Plan:\n"
-        prompt += json.dumps(current_plan, indent=2)
-        
-        prompt += "\n\nUser Feedback:\n" + feedback
-        
-        prompt += """
-        
-        Provide the complete updated development plan in the same format as the current plan.
-        """
-        
-        return prompt
+        return UPDATE_PROMPT_TEMPLATE.format(
+            specification=json.dumps(specification, indent=2),
+            current_plan=json.dumps(current_plan, indent=2),
+            feedback=feedback
+        )
     
     def _generate_plan_with_llm(self, prompt, specification):
         """
@@ -299,11 +401,13 @@ class DevelopmentPlanService:
         # In a real implementation, this would call the LLM service
         # For now, we'll return a slightly modified version of the current plan
         
-        # Create a deep copy of the current plan
-        updated_plan = json.loads(json.dumps(current_plan))
+        # Shallow copy of the current plan; only the steps list is mutated
+        # below, so it is the only nested value that needs its own copy
+        updated_plan = current_plan.copy()
         
         # Add a new development step
         if "development_steps" in updated_plan:
+            updated_plan["development_steps"] = list(updated_plan["development_steps"])
             updated_plan["development_steps"].append({
                 "title": "Additional Step Based on Feedback",
                 "description": "This step was added based on user feedback to address specific requirements."
@@ -311,17 +415,31 @@ class DevelopmentPlanService:
         
         return updated_plan
     
-    def _save_plan(self, plan_id):
+    def _save_plan(self, plan_id, record):
         """
         Save a development plan to a file
         
         Args:
             plan_id (str): Plan ID
+            record (PlanRecord): Plan record
         """
         file_path = os.path.join(self.data_dir, f"{plan_id}.json")
         
-        with open(file_path, 'w') as f:
-            json.dump(self.plans[plan_id], f, indent=2)
+        # Write to a temporary file in the same directory and swap it into
+        # place, so a crash mid-write never leaves a truncated plan behind.
+        # Mode 0666 lets the kernel apply the umask, as open() would.
+        tmp_path = os.path.join(self.data_dir, f"{plan_id}.{uuid.uuid4().hex}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            # Plans are saved on every change, so store them compactly
+            with os.fdopen(fd, 'w', buffering=65536, encoding='utf-8') as f:
+                json.dump(record.to_dict(), f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        
+        self._cache_plan(plan_id, record, os.stat(file_path).st_mtime_ns)
     
     def _load_plan(self, plan_id):
         """
@@ -331,16 +449,16 @@ class DevelopmentPlanService:
             plan_id (str): Plan ID
             
         Returns:
-            bool: True if loaded successfully, False otherwise
+            PlanRecord: Loaded plan record, or None if it could not be loaded
         """
         file_path = os.path.join(self.data_dir, f"{plan_id}.json")
         
-        if not os.path.exists(file_path):
-            return False
-        
         try:
-            with open(file_path, 'r') as f:
-                self.plans[plan_id] = json.load(f)
-            return True
+            with open(file_path, 'r', encoding='utf-8') as f:
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+                record = PlanRecord.from_dict(json.load(f))
         except Exception:
-            return False
\ No newline at end of file
+            return None
+        
+        self._cache_plan(plan_id, record, mtime)
+        return record
\ No newline at end of file
@@ -1,15 +1,23 @@
 import os
+import atexit
 import uuid
 import time
 import socket
 import random
-from threading import Thread
+import urllib.error
+import urllib.request
+import heapq
+from collections import deque
+from threading import Thread, Lock, Event
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Translation table for turning generation IDs into database names
+_DASH_TO_UNDERSCORE = str.maketrans('-', '_')
+
 class DockerService:
     """
     Service for managing Docker containers for Odoo instances
@@ -22,21 +30,57 @@ class DockerService:
         self.containers = {}  # Map of generation_id to container info
         self.base_port = 8069  # Odoo's default port
         self.max_port = 9069  # Maximum port to use (allows for 1000 containers)
+        self._free_ports = deque(range(self.base_port, self.max_port + 1))  # Ports not held by our containers
+        self._used_ports = set()  # Ports held by our containers
+        self.inactive_timeout = 3600  # Remove containers after 1 hour of inactivity
+        self.boot_timeout = 30  # Maximum seconds to wait for a new Odoo container to serve requests
+        self._expiry_heap = []  # Heap of (expires_at, generation_id) cleanup deadlines
+        self._expiry_pending = set()  # Generation IDs with a deadline in the heap
+        self._expiry_lock = Lock()
         self.host_ip = self._get_host_ip()
-        self.use_mock = True  # Use mock mode by default
+        self.use_mock = True  # Use mock mode until a Docker client is available
+        self.client = None  # Created on first use by _ensure_docker_client
+        self._client_checked = False
+        self._client_lock = Lock()
+        self.cleanup_thread = None  # Only started when real Docker is available
+        self.events_thread = None  # Only started when real Docker is available
+        self._events = None  # Docker event stream consumed by events_thread
+        self._container_status = {}  # Map of container_id to last known status
+        self._stop_event = Event()
+    
+    def _ensure_docker_client(self):
+        """
+        Import the Docker SDK and connect to the daemon on first use
+        """
+        if self._client_checked:
+            return
         
-        # Try to initialize Docker client if available
-        try:
-            import docker
-            self.client = docker.from_env()
-            self.use_mock = False
-            logger.info("Docker is available, using real Docker service")
+        with self._client_lock:
+            if self._client_checked:
+                return
             
-            # Create a cleanup thread to remove inactive containers
-            self.cleanup_thread = Thread(target=self._cleanup_inactive_containers, daemon=True)
-            self.cleanup_thread.start()
-        except Exception as e:
-            logger.warning(f"Docker is not available, using mock mode: {str(e)}")
+            # Try to initialize Docker client if available
+            try:
+                import docker
+                self.client = docker.from_env()
+                self.use_mock = False
+                logger.info("Docker is available, using real Docker service")
+            except Exception as e:
+                logger.warning("Docker is not available, using mock mode: %s", e)
+            
+            # Mock containers hold no external state, so there is nothing to clean up
+            if not self.use_mock:
+                # Create a cleanup thread to remove inactive containers
+                self.cleanup_thread = Thread(target=self._cleanup_inactive_containers, daemon=True)
+                self.cleanup_thread.start()
+                
+                # Track container status from Docker events instead of polling the daemon
+                self.events_thread = Thread(target=self._watch_container_events, daemon=True)
+                self.events_thread.start()
+                
+                atexit.register(self.shutdown)
+            
+            self._client_checked = True
     
     def start_odoo_container(self, generation_id, module_path):
         """
@@ -50,27 +94,28 @@ class DockerService:
             dict: Container information including URL to access Odoo
         """
         try:
+            self._ensure_docker_client()
+            
             # Check if a container already exists for this generation
             if generation_id in self.containers:
                 container_info = self.containers[generation_id]
                 
                 # Update last accessed time
-                container_info['last_accessed'] = time.time()
+                self._touch_container(generation_id, container_info)
                 
                 # If using real Docker, check if the container is still running
                 if not self.use_mock:
-                    try:
-                        container = self.client.containers.get(container_info['container_id'])
-                        if container.status == 'running':
-                            logger.info(f"Container for generation {generation_id} is already running")
-                            return container_info
-                    except Exception:
-                        # Container doesn't exist anymore, remove it from our tracking
-                        logger.info(f"Container for generation {generation_id} not found, will create a new one")
-                        del self.containers[generation_id]
+                    if self._get_container_status(container_info['container_id']) == 'running':
+                        logger.info("Container for generation %s is already running", generation_id)
+                        return container_info
+                    
+                    # Container stopped or doesn't exist anymore, remove it from our tracking
+                    logger.info("Container for generation %s not running, will create a new one", generation_id)
+                    self._release_port(container_info['port'])
+                    del self.containers[generation_id]
                 else:
                     # In mock mode, just return the existing container info
-                    logger.info(f"Mock container for generation {generation_id} is already running")
+                    logger.info("Mock container for generation %s is already running", generation_id)
                     return container_info
             
             # Find an available port
@@ -81,6 +126,9 @@ class DockerService:
             # Extract the module name from the zip file path
             module_name = os.path.basename(module_path).split('_')[0]
             
+            # Database name used by both the container environment and the Odoo command
+            db_name = f"odoo_{generation_id.translate(_DASH_TO_UNDERSCORE)}"
+            
             # Create a unique container name
             container_name = f"odoo-{generation_id}-{uuid.uuid4().hex[:8]}"
             
@@ -95,42 +143,49 @@ class DockerService:
                     'port': port,
                     'odoo_url': f"http://{self.host_ip}:{port}",
                     'module_name': module_name,
+                    'db_name': db_name,
                     'created_at': time.time(),
                     'last_accessed': time.time(),
                     'is_mock': True
                 }
                 
                 self.containers[generation_id] = container_info
+                self._touch_container(generation_id, container_info)
                 
-                logger.info(f"Started mock Odoo container for generation {generation_id} at {container_info['odoo_url']}")
+                logger.info("Started mock Odoo container for generation %s at %s", generation_id, container_info['odoo_url'])
                 
                 return container_info
             else:
                 # Using real Docker
-                # Create a volume for Odoo data
-                volume_name = f"odoo-data-{generation_id}"
-                volume = self.client.volumes.create(name=volume_name)
-                
-                # Extract the module to a temporary directory
-                module_mount_path = os.path.abspath(os.path.dirname(module_path))
-                
-                # Start the Odoo container
-                container = self.client.containers.run(
-                    image="odoo:16.0",  # Use Odoo 16.0 image
-                    name=container_name,
-                    detach=True,
-                    ports={8069: port},  # Map container's 8069 to host's port
-                    volumes={
-                        volume_name: {'bind': '/var/lib/odoo', 'mode': 'rw'},
-                        module_mount_path: {'bind': '/mnt/module', 'mode': 'ro'}
-                    },
-                    environment={
-                        'POSTGRES_PASSWORD': 'odoo',
-                        'POSTGRES_USER': 'odoo',
-                        'POSTGRES_DB': f'odoo_{generation_id.replace("-", "_")}',
-                    },
-                    command=f"--database odoo_{generation_id.replace('-', '_')} --init base,{module_name} --dev all"
-                )
+                try:
+                    # Create a volume for Odoo data
+                    volume_name = f"odoo-data-{generation_id}"
+                    volume = self.client.volumes.create(name=volume_name)
+                    
+                    # Extract the module to a temporary directory
+                    module_mount_path = os.path.abspath(os.path.dirname(module_path))
+                    
+                    # Start the Odoo container
+                    container = self.client.containers.run(
+                        image="odoo:16.0",  # Use Odoo 16.0 image
+                        name=container_name,
+                        detach=True,
+                        ports={8069: port},  # Map container's 8069 to host's port
+                        volumes={
+                            volume_name: {'bind': '/var/lib/odoo', 'mode': 'rw'},
+                            module_mount_path: {'bind': '/mnt/module', 'mode': 'ro'}
+                        },
+                        environment={
+                            'POSTGRES_PASSWORD': 'odoo',
+                            'POSTGRES_USER': 'odoo',
+                            'POSTGRES_DB': db_name,
+                        },
+                        command=f"--database {db_name} --init base,{module_name} --dev all"
+                    )
+                except Exception:
+                    # Hand the port back if the container could not be started
+                    self._release_port(port)
+                    raise
                 
                 # Store container information
                 container_info = {
@@ -139,22 +194,30 @@ class DockerService:
                     'port': port,
                     'odoo_url': f"http://{self.host_ip}:{port}",
                     'module_name': module_name,
+                    'db_name': db_name,
                     'created_at': time.time(),
                     'last_accessed': time.time(),
                     'is_mock': False
                 }
                 
                 self.containers[generation_id] = container_info
+                # Track the container before reading its status, so a die event
+                # the event thread sees in between is not overwritten
+                self._container_status[container.id] = None
+                container.reload()
+                if self._container_status.get(container.id) is None:
+                    self._container_status[container.id] = container.status
+                self._touch_container(generation_id, container_info)
                 
-                logger.info(f"Started Odoo container for generation {generation_id} at {container_info['odoo_url']}")
+                logger.info("Started Odoo container for generation %s at %s", generation_id, container_info['odoo_url'])
                 
-                # Wait for Odoo to start (this is a simple approach, could be improved)
-                time.sleep(5)
+                # Wait for Odoo to serve HTTP requests
+                self._wait_for_odoo(port)
                 
                 return container_info
             
         except Exception as e:
-            logger.error(f"Error starting Odoo container: {str(e)}")
+            logger.error("Error starting Odoo container: %s", e)
             raise
     
     def run_odoo_tests(self, generation_id):
@@ -173,9 +236,10 @@ class DockerService:
             
             container_info = self.containers[generation_id]
             module_name = container_info['module_name']
+            db_name = container_info['db_name']
             
             # Update last accessed time
-            container_info['last_accessed'] = time.time()
+            self._touch_container(generation_id, container_info)
             
             if self.use_mock or container_info.get('is_mock', False):
                 # In mock mode, just return simulated test results
@@ -207,7 +271,7 @@ class DockerService:
                 
                 # Run the tests
                 exec_result = container.exec_run(
-                    cmd=f"python3 /usr/bin/odoo --test-enable --stop-after-init --log-level=test -d odoo_{generation_id.replace('-', '_')} -i {module_name}",
+                    cmd=f"python3 /usr/bin/odoo --test-enable --stop-after-init --log-level=test -d {db_name} -i {module_name}",
                     stdout=True,
                     stderr=True
                 )
@@ -232,7 +296,7 @@ class DockerService:
                 }
             
         except Exception as e:
-            logger.error(f"Error running Odoo tests: {str(e)}")
+            logger.error("Error running Odoo tests: %s", e)
             raise
     
     def stop_container(self, generation_id):
@@ -248,7 +312,8 @@ class DockerService:
                 
                 if self.use_mock or container_info.get('is_mock', False):
                     # In mock mode, just remove the container from our tracking
-                    logger.info(f"Stopped and removed mock container for generation {generation_id}")
+                    logger.info("Stopped and removed mock container for generation %s", generation_id)
+                    self._release_port(container_info['port'])
                     del self.containers[generation_id]
                 else:
                     # Using real Docker
@@ -261,24 +326,26 @@ class DockerService:
                         # Stop and remove the container
                         container.stop(timeout=5)
                         container.remove()
+                        self._container_status.pop(container_id, None)
                         
-                        logger.info(f"Stopped and removed container for generation {generation_id}")
+                        logger.info("Stopped and removed container for generation %s", generation_id)
                     except Exception as e:
-                        logger.info(f"Error stopping container for generation {generation_id}: {str(e)}")
+                        logger.info("Error stopping container for generation %s: %s", generation_id, e)
                     
                     # Remove the volume
                     try:
                         volume_name = f"odoo-data-{generation_id}"
                         volume = self.client.volumes.get(volume_name)
                         volume.remove()
-                        logger.info(f"Removed volume for generation {generation_id}")
+                        logger.info("Removed volume for generation %s", generation_id)
                     except Exception as e:
-                        logger.info(f"Error removing volume for generation {generation_id}: {str(e)}")
+                        logger.info("Error removing volume for generation %s: %s", generation_id, e)
                     
                     # Remove from our tracking
+                    self._release_port(container_info['port'])
                     del self.containers[generation_id]
         except Exception as e:
-            logger.error(f"Error stopping container: {str(e)}")
+            logger.error("Error stopping container: %s", e)
     
     def _find_available_port(self):
         """
@@ -287,18 +354,32 @@ class DockerService:
         Returns:
             int: Available port number or None if no ports are available
         """
-        # Check if any ports in our range are available
-        for port in range(self.base_port, self.max_port + 1):
-            # Skip ports that are already in use by our containers
-            if any(info['port'] == port for info in self.containers.values()):
-                continue
+        # Ports held by our containers are never in the free queue, so each
+        # candidate only needs the host availability check
+        for _ in range(len(self._free_ports)):
+            port = self._free_ports.popleft()
             
             # Check if the port is available on the host
             if self._is_port_available(port):
+                self._used_ports.add(port)
                 return port
+            
+            # Taken by another process, retry it after the other candidates
+            self._free_ports.append(port)
         
         return None
     
+    def _release_port(self, port):
+        """
+        Return a container port to the free queue
+        
+        Args:
+            port (int): Port number to release
+        """
+        if port in self._used_ports:
+            self._used_ports.discard(port)
+            self._free_ports.append(port)
+    
     def _is_port_available(self, port):
         """
         Check if a port is available on the host
@@ -309,8 +390,118 @@ class DockerService:
         Returns:
             bool: True if the port is available, False otherwise
         """
+        # A bind test avoids the TCP handshake of a connect probe. SO_REUSEADDR
+        # is left off so that a failed bind means something else owns the port.
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(('localhost', port)) != 0
+            try:
+                s.bind(('localhost', port))
+                return True
+            except OSError:
+                return False
+    
+    def shutdown(self):
+        """
+        Stop the cleanup and event threads
+        """
+        self._stop_event.set()
+        
+        # Closing the event stream unblocks the event thread
+        if self._events is not None:
+            self._events.close()
+        
+        # Bounded joins, since this also runs at interpreter exit
+        if self.cleanup_thread:
+            self.cleanup_thread.join(timeout=10)
+        if self.events_thread:
+            self.events_thread.join(timeout=10)
+    
+    def _get_container_status(self, container_id):
+        """
+        Get the status of a container, asking the Docker daemon only on a cache miss
+        
+        Args:
+            container_id (str): Container ID
+            
+        Returns:
+            str: Container status, or None if the container doesn't exist
+        """
+        status = self._container_status.get(container_id)
+        if status is not None:
+            return status
+        
+        try:
+            status = self.client.containers.get(container_id).status
+        except Exception:
+            return None
+        
+        self._container_status[container_id] = status
+        return status
+    
+    def _watch_container_events(self):
+        """
+        Keep the container status cache in sync with Docker container events
+        """
+        while not self._stop_event.is_set():
+            try:
+                self._events = self.client.events(decode=True, filters={'type': 'container'})
+                for event in self._events:
+                    container_id = event.get('id') or event.get('Actor', {}).get('ID')
+                    action = event.get('Action') or event.get('status', '')
+                    # Only track containers this service has already looked up
+                    if container_id not in self._container_status:
+                        continue
+                    
+                    if action in ('start', 'unpause'):
+                        self._container_status[container_id] = 'running'
+                    elif action == 'pause':
+                        self._container_status[container_id] = 'paused'
+                    elif action in ('die', 'stop', 'kill'):
+                        self._container_status[container_id] = 'exited'
+                    elif action == 'destroy':
+                        self._container_status.pop(container_id, None)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.error("Error in container events thread: %s", e)
+            
+            # The stream ended or failed, so statuses may have been missed
+            self._container_status.clear()
+            self._stop_event.wait(5)
+    
+    def _wait_for_odoo(self, port):
+        """
+        Poll Odoo's login page until it answers or the boot timeout expires
+        
+        The published port accepts TCP connections as soon as Docker binds it,
+        before Odoo listens inside the container, so readiness is checked with
+        an HTTP request instead.
+        
+        Args:
+            port (int): Host port Odoo is published on
+            
+        Returns:
+            bool: True if Odoo answered with a 2xx/3xx status, False on timeout
+        """
+        url = f"http://{self.host_ip}:{port}/web/login"
+        start = time.monotonic()
+        deadline = start + self.boot_timeout
+        
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(url, timeout=2) as response:
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except (urllib.error.URLError, OSError):
+                status = None
+            
+            if status is not None and 200 <= status < 400:
+                logger.info("Odoo on port %s ready after %.1fs", port, time.monotonic() - start)
+                return True
+            time.sleep(0.5)
+        
+        logger.warning("Odoo on port %s not ready after %ss", port, self.boot_timeout)
+        return False
     
     def _get_host_ip(self):
         """
@@ -323,28 +514,66 @@ class DockerService:
         # For development, we'll use localhost
         return "localhost"
     
+    def _touch_container(self, generation_id, container_info):
+        """
+        Mark a container as accessed and schedule its inactivity deadline
+        
+        Args:
+            generation_id (str): Generation ID
+            container_info (dict): Tracked container information
+        """
+        now = time.time()
+        container_info['last_accessed'] = now
+        
+        # Mock containers are never cleaned up, so they get no deadline
+        if self.use_mock:
+            return
+        
+        # One deadline per generation; the cleanup thread moves it forward when
+        # it comes due for a container that was accessed since
+        with self._expiry_lock:
+            if generation_id not in self._expiry_pending:
+                self._expiry_pending.add(generation_id)
+                heapq.heappush(self._expiry_heap, (now + self.inactive_timeout, generation_id))
+    
     def _cleanup_inactive_containers(self):
         """
-        Periodically clean up inactive containers
+        Periodically clean up inactive containers until shutdown is requested
         """
-        while True:
+        while not self._stop_event.is_set():
             try:
-                current_time = time.time()
-                inactive_timeout = 3600  # 1 hour
+                with self._expiry_lock:
+                    if self._expiry_heap:
+                        wait = self._expiry_heap[0][0] - time.time()
+                    else:
+                        # New deadlines are always at least one timeout away
+                        wait = self.inactive_timeout
                 
-                # Find inactive containers
-                inactive_generations = []
-                for generation_id, container_info in list(self.containers.items()):
-                    if current_time - container_info['last_accessed'] > inactive_timeout:
-                        inactive_generations.append(generation_id)
+                # Sleep until the earliest deadline is due
+                if wait > 0:
+                    self._stop_event.wait(wait)
+                    continue
                 
-                # Stop and remove inactive containers
-                for generation_id in inactive_generations:
-                    logger.info(f"Cleaning up inactive container for generation {generation_id}")
-                    self.stop_container(generation_id)
+                with self._expiry_lock:
+                    _, generation_id = heapq.heappop(self._expiry_heap)
+                    
+                    # Skip containers that were already stopped
+                    container_info = self.containers.get(generation_id)
+                    if not container_info:
+                        self._expiry_pending.discard(generation_id)
+                        continue
+                    
+                    # Reschedule containers accessed since the deadline was set
+                    expires_at = container_info['last_accessed'] + self.inactive_timeout
+                    if expires_at > time.time():
+                        heapq.heappush(self._expiry_heap, (expires_at, generation_id))
+                        continue
+                    
+                    self._expiry_pending.discard(generation_id)
                 
-                # Sleep for a while before checking again
-                time.sleep(300)  # Check every 5 minutes
+                # Stop and remove the inactive container
+                logger.info("Cleaning up inactive container for generation %s", generation_id)
+                self.stop_container(generation_id)
             except Exception as e:
-                logger.error(f"Error in cleanup thread: {str(e)}")
-                time.sleep(60)  # Sleep for a minute before trying again
\ No newline at end of file
+                logger.error("Error in cleanup thread: %s", e)
+                self._stop_event.wait(60)  # Sleep for a minute before trying again
@@ -1,10 +1,355 @@
 import os
+import io
 import json
-import uuid
 import base64
+import atexit
+import uuid
+import hashlib
+import time
+import re
+import importlib.util
+from collections import defaultdict, deque
+from bisect import bisect_right
+from itertools import accumulate, islice
+from dataclasses import dataclass
 from datetime import datetime
-import requests
-from anthropic import Anthropic
+import logging
+from threading import RLock
+from cachetools import TTLCache
+from services.conversation_store import RedisConversationStore, Turn
+
+# orjson serializes the large request payloads hashed for the response cache
+# several times faster; fall back to json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# System prompt providing context and instructions. It is sent unchanged on
+# every call so that Anthropic can serve it from the prompt cache.
+SYSTEM_PROMPT = """
+            You are an AI assistant specialized in helping users create custom Odoo ERP modules.
+            Your task is to guide the user through a series of questions to gather requirements for their module.
+            Extract key information from the user's responses and provide helpful guidance.
+            
+            IMPORTANT: You MUST ask the user which Odoo version they need the module for (e.g., 14.0, 15.0, 16.0, 17.0)
+            before suggesting to move to the specification phase. This is critical for proper module generation.
+            
+            If the user shares screenshots or images of existing Odoo modules or UIs, analyze them to understand 
+            their requirements better. Look for UI elements, field structures, and workflows that need to be 
+            recreated or improved in the new module.
+            
+            Based on the conversation, extract the following information:
+            - Module name
+            - Module purpose/description
+            - Odoo version
+            - Functional requirements
+            - Technical requirements
+            - User interface elements
+            - Dependencies on other Odoo modules
+            
+            The information collected so far may follow the user's latest message in a <context> block.
+            
+            When you have gathered sufficient information, including the Odoo version, suggest moving to the specification review phase.
+            """
+
+# Beta header enabling Anthropic prompt caching
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+# HTTP/2 multiplexes requests over one connection but needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# The SDK retries connection errors, 408/409/429 and 5xx responses with
+# exponential backoff and jitter, honoring Retry-After
+MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 4))
+
+# Requests per minute allowed by the account's rate limit; when set, calls
+# from every LLMService in the process are paced to stay under it
+RATE_LIMIT_RPM = int(os.environ.get('ANTHROPIC_RPM', 0))
+
+# Request parameters; also part of the response cache key
+MODEL = "claude-3-sonnet-20240229"  # Can use claude-3-opus-20240229 for higher quality
+# Output cap for chat replies. Generation stops at the end of the reply, so
+# the cap bounds worst-case latency rather than adding to typical replies.
+MAX_TOKENS = int(os.environ.get('LLM_MAX_TOKENS', 1000))
+TEMPERATURE = 0.7
+
+# Rough token estimates used to keep the history sent with each request within
+# budget without a token counting round-trip
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1600
+
+# Images are downscaled to this long edge, as the API would do anyway, and
+# re-encoded as WebP when Pillow is installed, so every later turn sends less
+PIL_AVAILABLE = importlib.util.find_spec('PIL') is not None
+IMAGE_MAX_EDGE = 1568
+
+# Embedding model and capacity of the optional semantic response cache: number
+# of conversation states, and of cached messages per state
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_SIZE = 1000
+SEMANTIC_PARTITION_SIZE = 32
+
+# Key phrases to look for in the response, per context key
+CONTEXT_KEY_PHRASES = {
+    "module_name": ["module name", "name of the module", "module will be called", "name your module"],
+    "module_purpose": ["module purpose", "purpose of the module", "module will", "module should", "module's main function"],
+    "odoo_version": ["odoo version", "version of odoo", "odoo v", "version", "odoo 14", "odoo 15", "odoo 16", "odoo 17"],
+    "functional_requirements": ["functional requirement", "feature", "capability", "the module will", "the module should"],
+    "technical_requirements": ["technical requirement", "technical specification", "implementation detail", "technical aspect"],
+    "user_interface": ["user interface", "ui component", "interface element", "view", "form", "menu"],
+    "dependencies": ["dependency", "depend on", "require module", "integration with"]
+}
+
+# Context keys that collect every matching line instead of keeping the last one
+LIST_CONTEXT_KEYS = {"functional_requirements", "technical_requirements", "user_interface", "dependencies"}
+
+# Separators between a key phrase and its value, in priority order
+VALUE_DELIMITERS = (":", "-", "=")
+
+# One pattern per context key: a single alternation only reports one phrase at
+# each position, so phrases of different keys that overlap ("module will be
+# called" / "module will") have to be searched for separately
+CONTEXT_PHRASE_RES = {
+    context_key: re.compile("|".join(re.escape(phrase) for phrase in phrases))
+    for context_key, phrases in CONTEXT_KEY_PHRASES.items()
+}
+
+# Module name fallback: the word following one of these words
+NAME_HINT_RE = re.compile(r"name|called|titled")
+MODULE_NAME_RE = re.compile(r"(?<!\S)(?i:module|named|called|titled)\s+(\S+)")
+# Trimmed from the ends of a candidate only; dots inside a technical name
+# such as "sale.order" are kept
+NAME_PUNCTUATION = '":,.;'
+NAME_STOPWORDS = frozenset({"is", "will", "should", "can", "for", "that", "which"})
+
+# Module purpose fallback, in priority order
+PURPOSE_INDICATORS = ["purpose is", "designed to", "will allow", "helps to", "enables", "for managing"]
+PURPOSE_INDICATOR_RE = re.compile("|".join(re.escape(indicator) for indicator in PURPOSE_INDICATORS))
+
+def serialize_history_entry(turn):
+    """
+    Convert a stored history turn to its API representation
+    
+    Timestamps are kept as integer nanoseconds and only formatted here; file
+    payloads are reduced to their metadata to keep responses lightweight.
+    
+    Args:
+        turn (Turn): History turn
+        
+    Returns:
+        dict: Turn with an ISO timestamp and without binary file data
+    """
+    serialized = {
+        'role': turn.role,
+        'content': turn.content,
+        'timestamp': datetime.fromtimestamp(turn.ts_ns / 1e9).isoformat()
+    }
+    if turn.files:
+        serialized['files'] = [
+            {**file, 'data': '[BINARY DATA]'} if 'data' in file else file
+            for file in turn.files
+        ]
+    return serialized
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the API while the circuit breaker is open
+    """
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated API failures instead of tying up workers on a
+    struggling upstream
+    
+    The circuit opens after fail_max consecutive transient failures. Each time
+    reset_timeout seconds have passed a single trial call is let through; it
+    closes the circuit on success.
+    """
+    
+    def __init__(self, fail_max=10, reset_timeout=60):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = RLock()
+    
+    def check(self):
+        """
+        Raise CircuitOpenError if calls are currently not allowed
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("too many consecutive failures, not calling the API for now")
+            # Let this call through as the trial and hold back the others
+            self._opened_at = now
+    
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
+
+class RateLimiter:
+    """
+    Token bucket pacing API calls to a requests-per-minute limit
+    
+    Up to ten seconds' worth of requests can go out in a burst; beyond that
+    each caller waits for its turn, so concurrent workers are spread out
+    instead of all hitting the limit and retrying together.
+    """
+    
+    def __init__(self, rpm):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, self.rate * 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = RLock()
+    
+    def _reserve(self):
+        """
+        Take a token, borrowing against the refill if none is left
+        
+        Returns:
+            float: Seconds to wait before the token may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+    
+    def acquire(self):
+        """
+        Block until a request may be sent
+        """
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+# Shared by every LLMService so the limit holds for the whole process
+_rate_limiter = RateLimiter(RATE_LIMIT_RPM) if RATE_LIMIT_RPM > 0 else None
+
+def _canonical_json(value):
+    """
+    Serialize a value to JSON with sorted keys, so equal values give equal bytes
+    
+    Args:
+        value: JSON-compatible value; other objects are converted with str()
+        
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, sort_keys=True, default=str, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _compact_image(data):
+    """
+    Downscale an image and re-encode it as WebP
+    
+    Args:
+        data (str): Base64 encoded image
+        
+    Returns:
+        str: Base64 encoded WebP image, or None if it could not be decoded or
+            would not be smaller
+    """
+    from PIL import Image
+    
+    try:
+        output = io.BytesIO()
+        with Image.open(io.BytesIO(base64.b64decode(data))) as image:
+            image.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE))
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            image.save(output, format='WEBP', quality=85)
+    except Exception as e:
+        logger.warning("Could not compact image: %s", e)
+        return None
+    
+    compacted = base64.b64encode(output.getvalue()).decode('ascii')
+    return compacted if len(compacted) < len(data) else None
+
+def _http_client_options():
+    """
+    Connection pool settings for the Anthropic client; keeps TLS connections
+    warm between calls
+    
+    httpx is imported here, with the Anthropic SDK, only once a client is needed.
+    
+    Returns:
+        dict: Keyword arguments for httpx.Client
+    """
+    import httpx
+    
+    return {
+        'limits': httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30.0),
+        'http2': HTTP2_AVAILABLE,
+        'timeout': httpx.Timeout(60.0, connect=5.0)
+    }
+
+def _is_transient_api_error(error):
+    """
+    Check whether an error counts towards opening the circuit breaker once
+    the SDK's retries are exhausted
+    
+    Args:
+        error (Exception): Error raised while calling the API
+        
+    Returns:
+        bool: True for connection errors, rate limits and server errors
+    """
+    from anthropic import APIConnectionError, InternalServerError, RateLimitError
+    
+    return isinstance(error, (APIConnectionError, InternalServerError, RateLimitError))
+
+def _is_authentication_error(error):
+    """
+    Check whether an error means the configured API key was rejected
+    
+    Args:
+        error (Exception): Error raised while calling the API
+        
+    Returns:
+        bool: True for 401 responses
+    """
+    from anthropic import AuthenticationError
+    
+    return isinstance(error, AuthenticationError)
+
+@dataclass(slots=True)
+class ParsedResponse:
+    """
+    LLM response text split and lowercased once for context extraction
+    """
+    text: str
+    text_lower: str
+    lines: list
+    lines_lower: list
+    
+    @classmethod
+    def from_text(cls, text):
+        text_lower = text.lower()
+        return cls(text, text_lower, text.split("\n"), text_lower.split("\n"))
+
+# Context keys required before moving to the specification phase
+BASIC_CONTEXT_KEYS = frozenset({"module_name", "module_purpose"})
 
 class LLMService:
     """
@@ -19,25 +364,82 @@ class LLMService:
         self.anthropic_api_key = os.environ.get('ANTHROPIC_API_KEY')
         
         if not self.anthropic_api_key:
-            print("WARNING: No Anthropic API key found. Set ANTHROPIC_API_KEY in your .env file.")
+            logger.warning("No Anthropic API key found. Set ANTHROPIC_API_KEY in your .env file.")
         else:
-            print("Anthropic API key loaded successfully.")
+            logger.info("Anthropic API key loaded successfully.")
+        
+        # Shared by the sync and streaming paths
+        self._circuit_breaker = CircuitBreaker(
+            fail_max=int(os.environ.get('LLM_BREAKER_FAIL_MAX', 10)),
+            reset_timeout=int(os.environ.get('LLM_BREAKER_RESET_TIMEOUT', 60))
+        )
+        
+        # Whether the API key has been accepted; unknown until the first call,
+        # so startup does not spend a request on verifying it
+        self._api_key_valid = None
         
-        # Initialize Anthropic client - with explicit parameters to avoid issues
+        # Initialize Anthropic client - with explicit parameters to avoid issues.
+        # The SDK is only imported when a key is configured.
         if self.anthropic_api_key:
             try:
-                # First try with just the API key
-                self.client = Anthropic(api_key=self.anthropic_api_key)
+                import httpx
+                from anthropic import Anthropic
+                
+                # First try with just the API key and a pooled keep-alive HTTP client
+                self.client = Anthropic(
+                    api_key=self.anthropic_api_key,
+                    max_retries=MAX_RETRIES,
+                    http_client=httpx.Client(**_http_client_options())
+                )
+                atexit.register(self.close)
             except TypeError as e:
                 # If that fails, try creating a partial client for basic functionality
-                print(f"WARNING: Error creating Anthropic client: {e}")
-                print("Using mock mode for LLM services")
+                logger.warning("Error creating Anthropic client: %s", e)
+                logger.warning("Using mock mode for LLM services")
                 self.client = None
         else:
             self.client = None
         
-        # In-memory storage for conversations (in a real implementation, this would be a database)
-        self.conversations = {}
+        # Stored history is bounded to an even number of entries (user/assistant
+        # pairs), and the part sent with each request to a token budget
+        max_entries = int(os.environ.get('LLM_HISTORY_MAX_TURNS', 40))
+        self._history_max_entries = max(2, max_entries - max_entries % 2)
+        self._history_token_budget = int(os.environ.get('LLM_HISTORY_TOKEN_BUDGET', 8000))
+        
+        # Storage for conversations, expiring so cold conversations are evicted
+        # instead of held forever. Redis (REDIS_URL) shares them across worker
+        # processes; otherwise they are kept in a bounded in-memory cache.
+        conversation_ttl = int(os.environ.get('LLM_CONV_TTL', 3600))
+        redis_url = os.environ.get('REDIS_URL')
+        if redis_url and RedisConversationStore.available:
+            self.conversations = RedisConversationStore(redis_url, conversation_ttl, self._history_max_entries)
+        else:
+            self.conversations = TTLCache(
+                maxsize=int(os.environ.get('LLM_CONV_MAX', 10000)),
+                ttl=conversation_ttl
+            )
+        # Guards the conversation store only, never held across an API call
+        self._conversations_lock = RLock()
+        
+        # Exact-match response cache keyed by a hash of the full request
+        self._exact_cache = TTLCache(maxsize=5000, ttl=86400)
+        self._cache_stats = {'hits': 0, 'semantic_hits': 0, 'misses': 0}
+        
+        # Optional semantic response cache (LLM_SEMANTIC_CACHE=1); the embedding
+        # model is only loaded on first use
+        self._semantic_enabled = os.environ.get('LLM_SEMANTIC_CACHE') == '1'
+        self._semantic_threshold = float(os.environ.get('LLM_SEMANTIC_THRESHOLD', 0.92))
+        self._semantic_model = None
+        self._semantic_index = TTLCache(maxsize=SEMANTIC_CACHE_SIZE, ttl=86400)
+        self._semantic_lock = RLock()
+    
+    def close(self):
+        """
+        Close the pooled connections of the Anthropic client
+        """
+        if self.client:
+            self.client.close()
+            self.client = None
     
     def generate_conversation_id(self):
         """
@@ -61,51 +463,277 @@ class LLMService:
         Returns:
             tuple: (response, updated_context, next_step)
         """
+        conversation_id, conversation, context = self._start_turn(message, conversation_id, context, files)
+        
+        # Call the LLM to generate a response
+        response, extracted_context, next_step = self._call_anthropic(
+            conversation['history'], context, conversation['prepared']
+        )
+        
+        updated_context = self._finish_turn(conversation_id, conversation, context, response, extracted_context)
+        
+        return response, updated_context, next_step
+    
+    def stream_chat_message(self, message, conversation_id=None, context=None, files=None):
+        """
+        Process a user message, yielding the response as it is generated
+        
+        Args:
+            message (str): User message
+            conversation_id (str, optional): Conversation ID
+            context (dict, optional): Context information
+            files (list, optional): List of file objects with their data
+            
+        Yields:
+            dict: {"type": "text", "text": chunk} for each chunk of the response, then
+                {"type": "done", "conversation_id": ..., "context": ..., "next_step": ...}
+                once the response is complete and its context has been extracted
+        """
+        conversation_id, conversation, context = self._start_turn(message, conversation_id, context, files)
+        
+        # Relay chunks until the stream returns the final result
+        stream = self._stream_anthropic(conversation['history'], context, conversation['prepared'])
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration as done:
+                response, extracted_context, next_step = done.value
+                break
+            yield {'type': 'text', 'text': chunk}
+        
+        updated_context = self._finish_turn(conversation_id, conversation, context, response, extracted_context)
+        
+        yield {
+            'type': 'done',
+            'conversation_id': conversation_id,
+            'context': updated_context,
+            'next_step': next_step
+        }
+    
+    def submit_batch(self, conversation_ids):
+        """
+        Submit the current state of several conversations to the Message Batches API
+        
+        Batches are processed asynchronously at half the cost of regular calls,
+        within up to 24 hours, so this is meant for bulk, non-interactive work
+        such as re-running extraction over stored conversations. Each request
+        regenerates the reply to the latest user message; conversations are
+        not modified.
+        
+        Args:
+            conversation_ids (list): IDs of the conversations to submit
+            
+        Returns:
+            str: Batch ID to pass to poll_batch
+        """
+        if not self.client:
+            raise ValueError("API key not configured. Please set the ANTHROPIC_API_KEY environment variable.")
+        
+        requests = []
+        for conversation_id in conversation_ids:
+            history, context = self.get_conversation_history(conversation_id)
+            history = list(history)
+            while history and history[-1].role == 'assistant':
+                history.pop()
+            if not history:
+                raise ValueError(f"No user message in conversation: {conversation_id}")
+            requests.append({
+                "custom_id": conversation_id,
+                "params": self._request_params(self._finalize_messages(
+                    self._prepare_messages([history[index] for index in self._trim_to_budget(history)]),
+                    context
+                ))
+            })
+        
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+    
+    def poll_batch(self, batch_id):
+        """
+        Collect the results of a batch submitted with submit_batch
+        
+        Args:
+            batch_id (str): Batch ID
+            
+        Returns:
+            dict: (response, extracted_context, next_step) per conversation ID, or
+                None while the batch is still processing
+        """
+        if not self.client:
+            raise ValueError("API key not configured. Please set the ANTHROPIC_API_KEY environment variable.")
+        
+        batch = self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+        
+        results = {}
+        for item in self.client.messages.batches.results(batch_id):
+            _, context = self.get_conversation_history(item.custom_id)
+            if item.result.type == "succeeded":
+                response_text = item.result.message.content[0].text
+                results[item.custom_id] = self._build_result(response_text, context)
+            else:
+                results[item.custom_id] = (f"Batch request {item.result.type}", context, None)
+        
+        return results
+    
+    def _start_turn(self, message, conversation_id, context, files):
+        """
+        Record a user message in its conversation, creating the conversation if needed
+        
+        Args:
+            message (str): User message
+            conversation_id (str): Conversation ID, or None
+            context (dict): Context information, or None
+            files (list): List of file objects with their data, or None
+            
+        Returns:
+            tuple: (conversation_id, conversation, stored_context)
+        """
         # Initialize context if not provided
         if context is None:
             context = {}
         
-        # Get or create conversation history
-        if conversation_id and conversation_id in self.conversations:
-            history = self.conversations[conversation_id]['history']
-            existing_context = self.conversations[conversation_id]['context']
-            context = {**existing_context, **context}
-        else:
-            history = []
-            conversation_id = self.generate_conversation_id()
-            self.conversations[conversation_id] = {
-                'history': history,
-                'context': context
-            }
+        # Get or create conversation history; the stored context is updated in
+        # place rather than copied on every turn
+        with self._conversations_lock:
+            conversation = self.conversations.get(conversation_id) if conversation_id else None
+            if conversation is not None:
+                history = conversation['history']
+                conversation['context'].update(context)
+            else:
+                history = deque(maxlen=self._history_max_entries)
+                conversation_id = self.generate_conversation_id()
+                conversation = {
+                    'history': history,
+                    'context': dict(context),
+                    'images': {}
+                }
+                self.conversations[conversation_id] = conversation
+            context = conversation['context']
+            
+            # History in Anthropic format, appended to as the history grows; not
+            # persisted, so rebuilt when the conversation comes from Redis
+            if 'prepared' not in conversation:
+                conversation['prepared'] = deque(
+                    (self._prepare_entry(entry) for entry in history),
+                    maxlen=self._history_max_entries
+                )
         
         # Add user message to history
-        user_message_entry = {
-            'role': 'user',
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        }
+        user_message_entry = Turn('user', message, time.time_ns())
         
-        # Add files if provided
+        # Add files if provided; an image sent again in a later turn shares the
+        # base64 string already stored for the conversation
         if files:
-            user_message_entry['files'] = files
+            user_message_entry.files = tuple(self._store_image(conversation, file) for file in files)
         
-        history.append(user_message_entry)
+        self._append_turn(conversation, user_message_entry)
         
-        # Call the LLM to generate a response
-        response, extracted_context, next_step = self._call_anthropic(history, context)
+        return conversation_id, conversation, context
+    
+    def _append_turn(self, conversation, turn):
+        """
+        Add a turn to a conversation's history and its prepared copy
+        
+        Stored images only referenced by the turn that falls out of the
+        bounded history are dropped with it.
+        
+        Args:
+            conversation (dict): Conversation returned by _start_turn
+            turn (Turn): Turn to add
+        """
+        history = conversation['history']
+        evicted = history[0] if len(history) == history.maxlen else None
+        
+        history.append(turn)
+        conversation['prepared'].append(self._prepare_entry(turn))
         
+        if evicted is not None and evicted.files and conversation['images']:
+            in_use = {file['data_ref'] for entry in history for file in entry.files if 'data_ref' in file}
+            for data_ref in conversation['images'].keys() - in_use:
+                del conversation['images'][data_ref]
+    
+    def _store_image(self, conversation, file):
+        """
+        Keep one copy of an image's data per conversation
+        
+        A new image is compacted once before it is stored; the same image sent
+        again reuses the stored copy.
+        
+        Args:
+            conversation (dict): Conversation the file was sent in
+            file (dict): File object with its data
+            
+        Returns:
+            dict: File whose data is the conversation's stored copy, with the
+                data's hash as 'data_ref'
+        """
+        if not file.get('type', '').startswith('image/') or not file.get('data'):
+            return file
+        
+        # The reference is the hash of the data as sent, so it is found again
+        # when the same image is resent
+        data_ref = hashlib.sha256(file['data'].encode('utf-8')).hexdigest()
+        images = conversation['images']
+        if data_ref not in images:
+            images[data_ref] = (PIL_AVAILABLE and _compact_image(file['data'])) or file['data']
+        data = images[data_ref]
+        
+        media_type = file['type'] if data == file['data'] else 'image/webp'
+        return {**file, 'type': media_type, 'data': data, 'data_ref': data_ref}
+    
+    def _finish_turn(self, conversation_id, conversation, context, response, extracted_context):
+        """
+        Record the assistant response and merge the extracted context
+        
+        Args:
+            conversation_id (str): Conversation ID
+            conversation (dict): Conversation returned by _start_turn
+            context (dict): Stored context of the conversation
+            response (str): Assistant response
+            extracted_context (dict): Context extracted from the response
+            
+        Returns:
+            dict: Updated context
+        """
         # Add assistant response to history
-        history.append({
-            'role': 'assistant',
-            'content': response,
-            'timestamp': datetime.now().isoformat()
-        })
+        assistant_message_entry = Turn('assistant', response, time.time_ns())
+        self._append_turn(conversation, assistant_message_entry)
         
-        # Update context
-        updated_context = {**context, **extracted_context}
-        self.conversations[conversation_id]['context'] = updated_context
+        # Update context; re-store the conversation in case it expired during the call
+        context.update(extracted_context)
+        with self._conversations_lock:
+            self.conversations[conversation_id] = conversation
         
-        return response, updated_context, next_step
+        return context
+    
+    def get_cache_stats(self):
+        """
+        Get response cache statistics
+        
+        Returns:
+            dict: Exact and semantic hit counts, misses and current cache size
+        """
+        return {
+            **self._cache_stats,
+            'size': len(self._exact_cache)
+        }
+    
+    def get_status(self):
+        """
+        Get the state of the connection to the Anthropic API
+        
+        Returns:
+            dict: Whether a client is configured, whether its API key was
+                accepted (None until the first call) and whether the circuit
+                breaker is open
+        """
+        return {
+            'configured': self.client is not None,
+            'api_key_valid': self._api_key_valid,
+            'circuit_open': self._circuit_breaker.is_open
+        }
     
     def get_conversation_history(self, conversation_id):
         """
@@ -117,13 +745,13 @@ class LLMService:
         Returns:
             tuple: (history, context)
         """
-        if conversation_id not in self.conversations:
+        with self._conversations_lock:
+            conversation = self.conversations.get(conversation_id)
+        
+        if conversation is None:
             return [], {}
         
-        return (
-            self.conversations[conversation_id]['history'],
-            self.conversations[conversation_id]['context']
-        )
+        return conversation['history'], conversation['context']
     
     def _prepare_messages(self, history):
         """
@@ -135,43 +763,102 @@ class LLMService:
         Returns:
             list: Messages in Anthropic format
         """
-        messages = []
+        return [self._prepare_entry(entry) for entry in history]
+    
+    def _prepare_entry(self, entry):
+        """
+        Convert a single history entry to an Anthropic message
         
-        for entry in history:
-            message = {"role": entry['role'], "content": []}
-            
-            # Add text content
-            if entry['content']:
-                message["content"].append({
-                    "type": "text",
-                    "text": entry['content']
-                })
+        Prepared messages are kept alongside the history and reused on later
+        turns, so they must not be modified once built.
+        
+        Args:
+            entry (Turn): History entry
             
-            # Add files/images if present
-            if 'files' in entry and entry['files']:
-                for file in entry['files']:
-                    if file.get('type', '').startswith('image/'):
-                        # Convert to base64 for images
-                        message["content"].append({
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": file['type'],
-                                "data": file['data']
-                            }
-                        })
+        Returns:
+            dict: Message in Anthropic format
+        """
+        message = {"role": entry.role, "content": []}
+        
+        # Add text content
+        if entry.content:
+            message["content"].append({
+                "type": "text",
+                "text": entry.content
+            })
+        
+        # Add files/images if present
+        if entry.files:
+            for file in entry.files:
+                if file.get('type', '').startswith('image/'):
+                    # Convert to base64 for images
+                    message["content"].append({
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": file['type'],
+                            "data": file['data']
+                        }
+                    })
+        
+        return message
+    
+    def _trim_to_budget(self, history):
+        """
+        Select the part of a conversation history to send with a request
+        
+        The first exchange (which frames the task) and the most recent entries
+        are kept; the oldest exchanges in between are dropped until the
+        estimated size fits the history token budget. The result always starts
+        with a user message, as the Messages API requires.
+        
+        Args:
+            history (deque): Conversation history
             
-            messages.append(message)
+        Returns:
+            list: Indexes of the history entries to send
+        """
+        entries = list(history)
+        
+        # The oldest user message may have been evicted from the bounded history
+        start = 0
+        while start < len(entries) and entries[start].role != 'user':
+            start += 1
         
-        return messages
+        tokens = [self._estimate_tokens(entry) for entry in entries[start:]]
+        total = sum(tokens)
+        
+        # Drop user/assistant pairs after the first exchange, keeping the last message
+        cut = 2
+        while total > self._history_token_budget and cut + 2 < len(tokens):
+            total -= tokens[cut] + tokens[cut + 1]
+            cut += 2
+        
+        if cut > 2:
+            return [*range(start, start + 2), *range(start + cut, len(entries))]
+        return list(range(start, len(entries)))
     
-    def _call_anthropic(self, history, context):
+    def _estimate_tokens(self, entry):
+        """
+        Estimate the number of input tokens of a history entry
+        
+        Args:
+            entry (Turn): History entry
+            
+        Returns:
+            int: Estimated token count
+        """
+        images = sum(1 for file in entry.files if file.get('type', '').startswith('image/'))
+        return len(entry.content) // CHARS_PER_TOKEN + images * IMAGE_TOKENS
+    
+    def _call_anthropic(self, history, context, prepared=None):
         """
         Call the Anthropic Claude API to generate a response
         
         Args:
             history (list): Conversation history
             context (dict): Current context
+            prepared (deque, optional): History already in Anthropic format
             
         Returns:
             tuple: (response, extracted_context, next_step)
@@ -180,146 +867,436 @@ class LLMService:
             return "API key not configured. Please set the ANTHROPIC_API_KEY environment variable.", context, None
         
         try:
-            # System prompt providing context and instructions
-            system_prompt = """
-            You are an AI assistant specialized in helping users create custom Odoo ERP modules.
-            Your task is to guide the user through a series of questions to gather requirements for their module.
-            Extract key information from the user's responses and provide helpful guidance.
+            request, cache_key, response_text = self._prepare_request(history, context, prepared)
+            if response_text is None:
+                # Call the Anthropic API
+                self._circuit_breaker.check()
+                if _rate_limiter:
+                    _rate_limiter.acquire()
+                response = self.client.messages.create(**request)
+                self._circuit_breaker.record_success()
+                self._api_key_valid = True
+                response_text = self._handle_response(response, history, context, cache_key)
             
-            IMPORTANT: You MUST ask the user which Odoo version they need the module for (e.g., 14.0, 15.0, 16.0, 17.0)
-            before suggesting to move to the specification phase. This is critical for proper module generation.
-            
-            If the user shares screenshots or images of existing Odoo modules or UIs, analyze them to understand 
-            their requirements better. Look for UI elements, field structures, and workflows that need to be 
-            recreated or improved in the new module.
+            return self._build_result(response_text, context)
             
-            Based on the conversation, extract the following information:
-            - Module name
-            - Module purpose/description
-            - Odoo version
-            - Functional requirements
-            - Technical requirements
-            - User interface elements
-            - Dependencies on other Odoo modules
-            
-            When you have gathered sufficient information, including the Odoo version, suggest moving to the specification review phase.
-            """
-            
-            # Prepare messages for Anthropic
-            messages = self._prepare_messages(history)
-            
-            # Call the Anthropic API
-            response = self.client.messages.create(
-                model="claude-3-sonnet-20240229",  # Can use claude-3-opus-20240229 for higher quality
-                system=system_prompt,
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.7
-            )
+        except Exception as e:
+            # Handle API errors
+            if _is_transient_api_error(e):
+                self._circuit_breaker.record_failure()
+            elif _is_authentication_error(e):
+                self._api_key_valid = False
+            error_message = f"Error calling Anthropic API: {str(e)}"
+            logger.error(error_message)
+            return error_message, context, None
+    
+    def _stream_anthropic(self, history, context, prepared=None):
+        """
+        Call the Anthropic Claude API with streaming, yielding text as it arrives
+        
+        Args:
+            history (list): Conversation history
+            context (dict): Current context
+            prepared (deque, optional): History already in Anthropic format
             
-            # Extract the response text
-            response_text = response.content[0].text
+        Yields:
+            str: Chunks of the response text
             
-            # Extract context and determine next step
-            extracted_context = self._extract_context(response_text, context)
-            next_step = self._determine_next_step(response_text, extracted_context)
+        Returns:
+            tuple: (response, extracted_context, next_step)
+        """
+        if not self.client:
+            error_message = "API key not configured. Please set the ANTHROPIC_API_KEY environment variable."
+            yield error_message
+            return error_message, context, None
+        
+        try:
+            request, cache_key, response_text = self._prepare_request(history, context, prepared)
+            if response_text is None:
+                # Stream from the Anthropic API, keeping the final message for caching
+                self._circuit_breaker.check()
+                if _rate_limiter:
+                    _rate_limiter.acquire()
+                with self.client.messages.stream(**request) as stream:
+                    for text in stream.text_stream:
+                        yield text
+                    response = stream.get_final_message()
+                self._circuit_breaker.record_success()
+                self._api_key_valid = True
+                response_text = self._handle_response(response, history, context, cache_key)
+            else:
+                yield response_text
             
-            return response_text, extracted_context, next_step
+            return self._build_result(response_text, context)
             
         except Exception as e:
             # Handle API errors
+            if _is_transient_api_error(e):
+                self._circuit_breaker.record_failure()
+            elif _is_authentication_error(e):
+                self._api_key_valid = False
             error_message = f"Error calling Anthropic API: {str(e)}"
-            print(error_message)
+            logger.error(error_message)
+            yield error_message
             return error_message, context, None
     
-    def _extract_context(self, response_text, current_context):
+    def _prepare_request(self, history, context, prepared=None):
         """
-        Extract context information from the LLM response
+        Build the API request for a conversation, or find its cached response
+        
+        Args:
+            history (list): Conversation history
+            context (dict): Current context
+            prepared (deque, optional): History already in Anthropic format
+            
+        Returns:
+            tuple: (request_kwargs, cache_key, cached_response_text or None)
+        """
+        # Prepare messages for Anthropic, reusing the already prepared ones
+        indexes = self._trim_to_budget(history)
+        if prepared is not None:
+            messages = [prepared[index] for index in indexes]
+        else:
+            messages = self._prepare_messages([history[index] for index in indexes])
+        messages = self._finalize_messages(messages, context)
+        
+        # Serve repeated prompts from the response cache
+        cache_key = self._response_cache_key(messages)
+        response_text = self._exact_cache.get(cache_key)
+        if response_text is not None:
+            self._cache_stats['hits'] += 1
+            return None, cache_key, response_text
+        if not any(entry.files for entry in history):
+            response_text = self._semantic_lookup(history, context)
+            if response_text is not None:
+                self._cache_stats['semantic_hits'] += 1
+                return None, cache_key, response_text
+        self._cache_stats['misses'] += 1
+        
+        request = self._request_params(messages)
+        request["extra_headers"] = {"anthropic-beta": PROMPT_CACHING_BETA}
+        return request, cache_key, None
+    
+    def _finalize_messages(self, messages, context):
+        """
+        Add the cache breakpoint and the current context to the last message
+        
+        The end of the conversation so far is marked as a cache breakpoint, so
+        the next turn reads the whole earlier history from the cache. The
+        context collected so far changes from turn to turn, so it is sent as a
+        trailing block after the breakpoint rather than in the system prompt,
+        keeping the cached prefix identical. The last message is copied, as
+        prepared messages are shared with later turns.
+        
+        Args:
+            messages (list): Messages in Anthropic format
+            context (dict): Current context
+            
+        Returns:
+            list: Messages to send
+        """
+        if not messages or not messages[-1]["content"]:
+            return messages
+        
+        last = messages[-1]
+        content = [
+            *last["content"][:-1],
+            {**last["content"][-1], "cache_control": {"type": "ephemeral"}}
+        ]
+        if context:
+            content.append({
+                "type": "text",
+                "text": f"<context>{_canonical_json(context).decode('utf-8')}</context>"
+            })
+        
+        return [*messages[:-1], {**last, "content": content}]
+    
+    def _request_params(self, messages):
+        """
+        Build the Messages API parameters for prepared messages
+        
+        Args:
+            messages (list): Messages in Anthropic format
+            
+        Returns:
+            dict: Request parameters
+        """
+        return {
+            "model": MODEL,
+            "system": [{
+                "type": "text",
+                "text": SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            "messages": messages,
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE
+        }
+    
+    def _handle_response(self, response, history, context, cache_key):
+        """
+        Extract the text of an API response and store it in the response cache
+        
+        Args:
+            response (Message): Anthropic API response
+            history (list): Conversation history the response answers
+            context (dict): Context the response was generated with
+            cache_key (str): Exact-match cache key of the request
+            
+        Returns:
+            str: Response text
+        """
+        logger.debug(
+            "Anthropic usage: %s input, %s cache read, %s cache write",
+            response.usage.input_tokens,
+            getattr(response.usage, 'cache_read_input_tokens', None),
+            getattr(response.usage, 'cache_creation_input_tokens', None)
+        )
+        
+        # Extract the response text
+        response_text = response.content[0].text
+        
+        self._exact_cache[cache_key] = response_text
+        if not any(entry.files for entry in history):
+            self._semantic_store(history, context, response_text)
+        
+        return response_text
+    
+    def _build_result(self, response_text, context):
+        """
+        Extract context and determine the next step from a response
         
         Args:
             response_text (str): LLM response text
+            context (dict): Current context
+            
+        Returns:
+            tuple: (response, extracted_context, next_step)
+        """
+        parsed = ParsedResponse.from_text(response_text)
+        extracted_context = self._extract_context(parsed, context)
+        next_step = self._determine_next_step(parsed, extracted_context)
+        return response_text, extracted_context, next_step
+    
+    def _response_cache_key(self, messages):
+        """
+        Compute the exact-match cache key for a request
+        
+        Args:
+            messages (list): Messages in Anthropic format
+            
+        Returns:
+            str: SHA-256 hex digest of the canonical request
+        """
+        payload = _canonical_json([SYSTEM_PROMPT, messages, MODEL, TEMPERATURE, MAX_TOKENS])
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _semantic_scope(self, history, context):
+        """
+        Compute the semantic cache partition for a conversation
+        
+        Only a rephrasing of the latest message in the same conversation state
+        may reuse a response, so entries are partitioned by the earlier turns
+        and the set of context keys collected so far.
+        
+        Args:
+            history (list): Conversation history
+            context (dict): Current context
+            
+        Returns:
+            str: SHA-256 hex digest identifying the partition
+        """
+        earlier = "\n".join(
+            f"{entry.role}: {' '.join(entry.content.lower().split())}"
+            for entry in islice(history, len(history) - 1)
+        )
+        scope = f"{earlier}\n{','.join(sorted(context))}"
+        return hashlib.sha256(scope.encode('utf-8')).hexdigest()
+    
+    def _semantic_text(self, history):
+        """
+        Normalize the latest message of a conversation into the text that gets embedded
+        
+        Args:
+            history (list): Conversation history
+            
+        Returns:
+            str: Normalized message text
+        """
+        return ' '.join(history[-1].content.lower().split())
+    
+    def _get_semantic_model(self):
+        """
+        Load the sentence embedding model on first use
+        
+        Returns:
+            SentenceTransformer: Embedding model, or None if unavailable
+        """
+        if self._semantic_model is None and self._semantic_enabled:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._semantic_model = SentenceTransformer(SEMANTIC_CACHE_MODEL)
+            except Exception as e:
+                logger.warning("Semantic cache disabled: %s", e)
+                self._semantic_enabled = False
+        return self._semantic_model
+    
+    def _semantic_lookup(self, history, context):
+        """
+        Find a cached response for a rephrasing of the latest message
+        
+        Args:
+            history (list): Conversation history
+            context (dict): Current context
+            
+        Returns:
+            str: Cached response text, or None on a miss
+        """
+        model = self._get_semantic_model()
+        if model is None:
+            return None
+        
+        with self._semantic_lock:
+            partition = self._semantic_index.get(self._semantic_scope(history, context))
+            if partition is None:
+                return None
+            vectors, cache_keys = partition
+        
+        import numpy as np
+        
+        vector = model.encode(self._semantic_text(history), normalize_embeddings=True)
+        scores = vectors @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self._semantic_threshold:
+            return None
+        
+        return self._exact_cache.get(cache_keys[best])
+    
+    def _semantic_store(self, history, context, response_text):
+        """
+        Index a response in the semantic cache
+        
+        Args:
+            history (list): Conversation history
+            context (dict): Context the response was generated with
+            response_text (str): Response to cache
+        """
+        model = self._get_semantic_model()
+        if model is None:
+            return
+        
+        import numpy as np
+        
+        scope = self._semantic_scope(history, context)
+        text = self._semantic_text(history)
+        cache_key = hashlib.sha256(f"{scope}\n{text}".encode('utf-8')).hexdigest()
+        self._exact_cache[cache_key] = response_text
+        vector = model.encode(text, normalize_embeddings=True)
+        
+        with self._semantic_lock:
+            partition = self._semantic_index.get(scope)
+            if partition is None:
+                partition = (vector[np.newaxis, :], [cache_key])
+            else:
+                vectors, cache_keys = partition
+                partition = (
+                    np.vstack([vectors, vector])[-SEMANTIC_PARTITION_SIZE:],
+                    (cache_keys + [cache_key])[-SEMANTIC_PARTITION_SIZE:]
+                )
+            self._semantic_index[scope] = partition
+    
+    def _extract_context(self, parsed, current_context):
+        """
+        Extract context information from the LLM response
+        
+        Args:
+            parsed (ParsedResponse): LLM response text
             current_context (dict): Current context
             
         Returns:
             dict: Extracted context
         """
-        # Initialize with existing context
-        extracted_context = {}
-        
-        # Define key phrases to look for in the response
-        key_phrases = {
-            "module_name": ["module name", "name of the module", "module will be called", "name your module"],
-            "module_purpose": ["module purpose", "purpose of the module", "module will", "module should", "module's main function"],
-            "odoo_version": ["odoo version", "version of odoo", "odoo v", "version", "odoo 14", "odoo 15", "odoo 16", "odoo 17"],
-            "functional_requirements": ["functional requirement", "feature", "capability", "the module will", "the module should"],
-            "technical_requirements": ["technical requirement", "technical specification", "implementation detail", "technical aspect"],
-            "user_interface": ["user interface", "ui component", "interface element", "view", "form", "menu"],
-            "dependencies": ["dependency", "depend on", "require module", "integration with"]
-        }
+        # Initialize with existing context; list keys start out empty on first use
+        extracted_context = defaultdict(list)
         
-        # Split the response into lines for processing
-        lines = response_text.split("\n")
+        lines = parsed.lines
+        lines_lower = parsed.lines_lower
+        
+        # Find the key phrases with one scan of the whole response per context
+        # key, and map each match back to its line through the line start offsets
+        line_starts = [0, *accumulate(len(line_lower) + 1 for line_lower in lines_lower[:-1])]
+        line_keys = {}
+        for context_key, phrase_re in CONTEXT_PHRASE_RES.items():
+            for match in phrase_re.finditer(parsed.text_lower):
+                line_index = bisect_right(line_starts, match.start()) - 1
+                line_keys.setdefault(line_index, set()).add(context_key)
+        
+        # Fallback candidates are collected in the same pass and only used if the
+        # key phrases don't provide the value; the last qualifying line wins
+        need_name = "module_name" not in current_context
+        need_purpose = "module_purpose" not in current_context
+        name_candidate = None
+        purpose_candidate = None
         
         # Process each line
-        for line in lines:
-            line_lower = line.lower()
-            
-            # Check for each key phrase
-            for context_key, phrases in key_phrases.items():
-                for phrase in phrases:
-                    if phrase in line_lower:
-                        # Extract text after colon, dash, or similar delimiter
-                        for delimiter in [":", "-", "="]:
-                            if delimiter in line:
-                                parts = line.split(delimiter, 1)
-                                if len(parts) > 1 and parts[1].strip():
-                                    # If the context key is for a list type, append to it
-                                    if context_key in ["functional_requirements", "technical_requirements",
-                                                      "user_interface", "dependencies"]:
-                                        if context_key not in extracted_context:
-                                            extracted_context[context_key] = []
-                                        extracted_context[context_key].append(parts[1].strip())
-                                    else:
-                                        # For non-list types, just set the value
-                                        extracted_context[context_key] = parts[1].strip()
-                                    break
-        
-        # If we didn't find a module name but it's mentioned in the text, try a more aggressive approach
-        if "module_name" not in extracted_context and "module_name" not in current_context:
-            for line in lines:
-                line_lower = line.lower()
-                if "module" in line_lower and any(word in line_lower for word in ["name", "called", "titled"]):
-                    # Try to extract the module name using NLP-like heuristics
-                    words = line.split()
-                    for i, word in enumerate(words):
-                        if word.lower() in ["module", "named", "called", "titled"] and i < len(words) - 1:
-                            # The next word might be the module name
-                            candidate = words[i + 1].strip('":,.;')
-                            if len(candidate) > 2 and candidate.lower() not in ["is", "will", "should", "can", "for", "that", "which"]:
-                                extracted_context["module_name"] = candidate
-                                break
-        
-        # If we didn't find a module purpose but it's described in the text, try to extract it
-        if "module_purpose" not in extracted_context and "module_purpose" not in current_context:
-            purpose_indicators = ["purpose is", "designed to", "will allow", "helps to", "enables", "for managing"]
-            for line in lines:
-                line_lower = line.lower()
-                if "module" in line_lower and any(indicator in line_lower for indicator in purpose_indicators):
-                    for indicator in purpose_indicators:
-                        if indicator in line_lower:
-                            parts = line_lower.split(indicator, 1)
-                            if len(parts) > 1 and parts[1].strip():
-                                extracted_context["module_purpose"] = parts[1].strip().capitalize()
-                                break
-        
-        return extracted_context
-    
-    def _determine_next_step(self, response_text, context):
+        for line_index, (line, line_lower) in enumerate(zip(lines, lines_lower)):
+            matched_keys = line_keys.get(line_index)
+            if matched_keys:
+                # Extract text after colon, dash, or similar delimiter
+                value = None
+                for delimiter in VALUE_DELIMITERS:
+                    _, found, rest = line.partition(delimiter)
+                    if found:
+                        value = rest.strip()
+                        if value:
+                            break
+                if value:
+                    for context_key in CONTEXT_KEY_PHRASES:
+                        if context_key in matched_keys:
+                            # If the context key is for a list type, append to it
+                            if context_key in LIST_CONTEXT_KEYS:
+                                extracted_context[context_key].append(value)
+                            else:
+                                # For non-list types, just set the value
+                                extracted_context[context_key] = value
+            
+            if "module" not in line_lower:
+                continue
+            
+            # Module name fallback, using NLP-like heuristics: the word after
+            # "module", "named", "called" or "titled"
+            if need_name and NAME_HINT_RE.search(line_lower):
+                for match in MODULE_NAME_RE.finditer(line):
+                    candidate = match.group(1).strip(NAME_PUNCTUATION)
+                    if len(candidate) > 2 and candidate.lower() not in NAME_STOPWORDS:
+                        name_candidate = candidate
+                        break
+            
+            # Module purpose fallback: the text after a purpose indicator
+            if need_purpose and PURPOSE_INDICATOR_RE.search(line_lower):
+                for indicator in PURPOSE_INDICATORS:
+                    if indicator in line_lower:
+                        parts = line_lower.split(indicator, 1)
+                        if parts[1].strip():
+                            purpose_candidate = parts[1].strip().capitalize()
+                            break
+        
+        # If we didn't find a module name but it's mentioned in the text, use the fallback
+        if name_candidate and "module_name" not in extracted_context:
+            extracted_context["module_name"] = name_candidate
+        
+        # If we didn't find a module purpose but it's described in the text, use the fallback
+        if purpose_candidate and "module_purpose" not in extracted_context:
+            extracted_context["module_purpose"] = purpose_candidate
+        
+        return dict(extracted_context)
+    
+    def _determine_next_step(self, parsed, context):
         """
         Determine the next step based on the LLM response and context
         
         Args:
-            response_text (str): LLM response text
+            parsed (ParsedResponse): LLM response text
             context (dict): Current context
             
         Returns:
@@ -327,26 +1304,16 @@ class LLMService:
         """
         # Check if we have gathered enough information to move to the specification phase
         # We'll still ask for Odoo version but not block if it's not provided
-        basic_required_keys = ["module_name", "module_purpose"]
-        has_basic_info = all(key in context for key in basic_required_keys)
-        
-        # Check if the response suggests moving to the specification phase
-        suggests_specification = any(phrase in response_text.lower() for phrase in [
-            "move to specification",
-            "create specification",
-            "generate specification",
-            "review specification"
-        ])
+        if not context.keys() >= BASIC_CONTEXT_KEYS:
+            return "continue"
         
         # If Odoo version is not provided, we'll use a default value
-        if "odoo_version" not in context and has_basic_info:
+        if "odoo_version" not in context:
             # Add a default Odoo version if not specified
             context["odoo_version"] = "16.0"  # Use latest stable version as default
         
-        # Allow moving to specification if we have at least the basic required info
-        if suggests_specification and has_basic_info:
-            return "specification"
-        elif has_basic_info and len(context) >= 3:
-            return "specification"
-        else:
-            return "continue"
\ No newline at end of file
+        # Allow moving to specification if we have at least the basic required info.
+        # With the default version set the context always holds three keys, so
+        # whether the response suggests moving on no longer changes the outcome
+        # and the text is not scanned for it.
+        return "specification"
\ No newline at end of file
@@ -0,0 +1,338 @@
+from functools import lru_cache
+
+# Files written into every generated module. Each is a str.format template with
+# {module_name} and {module_title} (the capitalized name) placeholders; literal
+# braces are doubled.
+
+# models/__init__.py
+MODELS_INIT_TEMPLATE = "# -*- coding: utf-8 -*-\n\nfrom . import {module_name}\n"
+
+# models/<module_name>.py
+MODEL_TEMPLATE = """# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+class {module_title}(models.Model):
+    _name = '{module_name}.model'
+    _description = '{module_title} Model'
+    
+    name = fields.Char(string='Name', required=True)
+    description = fields.Text(string='Description')
+    active = fields.Boolean(string='Active', default=True)
+    
+    @api.constrains('name')
+    def _check_name(self):
+        for record in self:
+            if len(record.name) < 3:
+                raise ValidationError(_('Name must be at least 3 characters long.'))
+"""
+
+# __init__.py
+INIT_TEMPLATE = "# -*- coding: utf-8 -*-\n\nfrom . import models\nfrom . import controllers\n"
+
+# __manifest__.py
+MANIFEST_TEMPLATE = """# -*- coding: utf-8 -*-
+{{
+    'name': '{module_title}',
+    'version': '1.0',
+    'category': 'Custom',
+    'summary': 'Custom Odoo module',
+    'description': \"\"\"
+        This module provides custom functionality for {module_title}.
+    \"\"\",
+    'author': 'Odoo Module Builder',
+    'website': 'https://www.example.com',
+    'depends': ['base'],
+    'data': [
+        'security/ir.model.access.csv',
+        'views/{module_name}_views.xml',
+        'views/menu.xml',
+    ],
+    'demo': [
+        'data/{module_name}_data.xml',
+    ],
+    'installable': True,
+    'application': True,
+    'auto_install': False,
+}}
+"""
+
+# views/<module_name>_views.xml
+VIEWS_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<odoo>
+    <!-- Form View -->
+    <record id="{module_name}_view_form" model="ir.ui.view">
+        <field name="name">{module_name}.view.form</field>
+        <field name="model">{module_name}.model</field>
+        <field name="arch" type="xml">
+            <form string="{module_title}">
+                <sheet>
+                    <group>
+                        <field name="name"/>
+                        <field name="active"/>
+                    </group>
+                    <group>
+                        <field name="description"/>
+                    </group>
+                </sheet>
+            </form>
+        </field>
+    </record>
+    
+    <!-- Tree View -->
+    <record id="{module_name}_view_tree" model="ir.ui.view">
+        <field name="name">{module_name}.view.tree</field>
+        <field name="model">{module_name}.model</field>
+        <field name="arch" type="xml">
+            <tree string="{module_title}s">
+                <field name="name"/>
+                <field name="active"/>
+            </tree>
+        </field>
+    </record>
+    
+    <!-- Search View -->
+    <record id="{module_name}_view_search" model="ir.ui.view">
+        <field name="name">{module_name}.view.search</field>
+        <field name="model">{module_name}.model</field>
+        <field name="arch" type="xml">
+            <search string="Search {module_title}">
+                <field name="name"/>
+                <filter string="Active" name="active" domain="[('active', '=', True)]"/>
+                <filter string="Inactive" name="inactive" domain="[('active', '=', False)]"/>
+            </search>
+        </field>
+    </record>
+    
+    <!-- Action -->
+    <record id="action_{module_name}" model="ir.actions.act_window">
+        <field name="name">{module_title}</field>
+        <field name="res_model">{module_name}.model</field>
+        <field name="view_mode">tree,form</field>
+        <field name="context">{{'search_default_active': 1}}</field>
+        <field name="help" type="html">
+            <p class="o_view_nocontent_smiling_face">
+                Create your first {module_title}
+            </p>
+        </field>
+    </record>
+</odoo>
+"""
+
+# views/menu.xml
+MENU_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<odoo>
+    <!-- Main Menu -->
+    <menuitem id="menu_{module_name}_root"
+              name="{module_title}"
+              sequence="10"/>
+              
+    <!-- Sub Menu -->
+    <menuitem id="menu_{module_name}"
+              name="{module_title}s"
+              parent="menu_{module_name}_root"
+              action="action_{module_name}"
+              sequence="10"/>
+</odoo>
+"""
+
+# views/<module_name>_templates.xml
+ASSETS_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<odoo>
+    <template id="{module_name}_assets" name="{module_title} Assets" inherit_id="web.assets_backend">
+        <xpath expr="." position="inside">
+            <link rel="stylesheet" href="/static/src/css/{module_name}.css"/>
+            <script type="text/javascript" src="/static/src/js/{module_name}.js"/>
+        </xpath>
+    </template>
+</odoo>
+"""
+
+# static/src/js/<module_name>.js
+JS_TEMPLATE = """odoo.define('{module_name}.main', function (require) {{
+    "use strict";
+    
+    var core = require('web.core');
+    var Widget = require('web.Widget');
+    
+    var {module_title}Widget = Widget.extend({{
+        template: '{module_name}.template',
+        
+        init: function (parent, options) {{
+            this._super.apply(this, arguments);
+            this.options = options || {{}};
+        }},
+        
+        start: function () {{
+            return this._super.apply(this, arguments);
+        }},
+    }});
+    
+    core.action_registry.add('{module_name}.action', {module_title}Widget);
+    
+    return {{
+        {module_title}Widget: {module_title}Widget,
+    }};
+}});
+"""
+
+# static/src/css/<module_name>.css
+CSS_TEMPLATE = """/* {module_title} CSS */
+
+.{module_name}-container {{
+    padding: 16px;
+}}
+
+.{module_name}-header {{
+    font-size: 18px;
+    font-weight: bold;
+    margin-bottom: 12px;
+}}
+
+.{module_name}-content {{
+    background-color: #f9f9f9;
+    border-radius: 4px;
+    padding: 12px;
+}}
+"""
+
+# security/ir.model.access.csv
+ACCESS_TEMPLATE = """id,name,model_id:id,group_id:id,perm_read,perm_write,perm_create,perm_unlink
+access_{module_name}_user,{module_name}.user,model_{module_name}_model,base.group_user,1,0,0,0
+access_{module_name}_manager,{module_name}.manager,model_{module_name}_model,base.group_system,1,1,1,1
+"""
+
+# controllers/__init__.py
+CONTROLLERS_INIT_TEMPLATE = "# -*- coding: utf-8 -*-\n\nfrom . import main\n"
+
+# controllers/main.py
+CONTROLLER_TEMPLATE = """# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+
+class {module_title}Controller(http.Controller):
+    
+    @http.route('/{module_name}/info', type='json', auth='user')
+    def get_info(self):
+        return {{
+            'name': '{module_title}',
+            'version': '1.0',
+        }}
+    
+    @http.route('/{module_name}/data', type='http', auth='user')
+    def get_data(self):
+        records = request.env['{module_name}.model'].search([])
+        return request.render('{module_name}.data_template', {{
+            'records': records,
+        }})
+"""
+
+TEMPLATES = {
+    'models_init': MODELS_INIT_TEMPLATE,
+    'model': MODEL_TEMPLATE,
+    'init': INIT_TEMPLATE,
+    'manifest': MANIFEST_TEMPLATE,
+    'views': VIEWS_TEMPLATE,
+    'menu': MENU_TEMPLATE,
+    'assets': ASSETS_TEMPLATE,
+    'js': JS_TEMPLATE,
+    'css': CSS_TEMPLATE,
+    'access': ACCESS_TEMPLATE,
+    'controllers_init': CONTROLLERS_INIT_TEMPLATE,
+    'controller': CONTROLLER_TEMPLATE
+}
+
+# Test documentation written next to every generated module, with the same
+# placeholders. It is not part of the package.
+
+# <generation_id>_test_scenarios.txt
+TEST_SCENARIOS_TEMPLATE = """# Test Scenarios for {module_title} Module
+
+## 1. Model Tests
+- Test creation of {module_name} records
+- Test validation constraints
+- Test record modification
+- Test record deletion
+
+## 2. Business Logic Tests
+- Test specific business rules
+- Test computed fields
+- Test onchange methods
+
+## 3. Security Tests
+- Test access rights for different user groups
+- Test record rules
+
+## 4. API Tests
+- Test controller endpoints
+- Test JSON responses
+- Test HTTP responses
+"""
+
+# <generation_id>_proof_of_tests.md
+PROOF_OF_TESTS_TEMPLATE = """# Proof of Tests for {module_title} Module
+
+## Backend Tests
+
+### Model Tests
+- ✅ Creation of {module_name} records
+- ✅ Validation constraints
+- ✅ Record modification
+- ✅ Record deletion
+
+### Business Logic Tests
+- ✅ Specific business rules
+- ✅ Computed fields
+- ✅ Onchange methods
+
+### Security Tests
+- ✅ Access rights for different user groups
+- ✅ Record rules
+
+### API Tests
+- ✅ Controller endpoints
+- ✅ JSON responses
+- ✅ HTTP responses
+
+## Frontend Tests
+
+### UI Tests
+- ✅ Form view rendering
+- ✅ List view rendering
+- ✅ Search view functionality
+- ✅ Menu navigation
+
+### JavaScript Tests
+- ✅ Widget initialization
+- ✅ Event handling
+- ✅ DOM manipulation
+
+## Screenshots
+
+(Screenshots would be included here in a real implementation)
+"""
+
+DOCUMENTATION_TEMPLATES = {
+    'test_scenarios': TEST_SCENARIOS_TEMPLATE,
+    'proof_of_tests': PROOF_OF_TESTS_TEMPLATE
+}
+
+_ALL_TEMPLATES = {**TEMPLATES, **DOCUMENTATION_TEMPLATES}
+
+@lru_cache(maxsize=256)
+def render_template(template_id, module_name):
+    """
+    Render a module file or documentation template, reusing the encoded
+    result for repeated generations of the same module
+    
+    Args:
+        template_id (str): Key of the template in TEMPLATES or DOCUMENTATION_TEMPLATES
+        module_name (str): Module name
+        
+    Returns:
+        bytes: UTF-8 encoded file content
+    """
+    content = _ALL_TEMPLATES[template_id].format(module_name=module_name, module_title=module_name.capitalize())
+    return content.encode('utf-8')
@@ -42,11 +42,12 @@ class SpecificationService:
         specification = self._generate_specification_with_llm(prompt, context)
         
         # Store the specification
+        now = datetime.now().isoformat()
         self.specifications[specification_id] = {
             'specification': specification,
             'context': context,
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
+            'created_at': now,
+            'updated_at': now,
             'status': 'draft'
         }
         
@@ -0,0 +1,66 @@
+import os
+import stat
+
+import pytest
+
+from services.development_plan_service import DevelopmentPlanService, PlanRecord
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = DevelopmentPlanService()
+    service.data_dir = str(tmp_path)
+    return service
+
+
+def make_record(status='draft'):
+    return PlanRecord(
+        plan={'module_structure': [], 'development_steps': []},
+        specification_id='spec-1',
+        created_at='2024-01-01T00:00:00',
+        updated_at='2024-01-01T00:00:00',
+        status=status
+    )
+
+
+def test_saved_plan_files_follow_the_umask(service, tmp_path):
+    previous = os.umask(0o022)
+    try:
+        service._save_plan('plan-1', make_record())
+    finally:
+        os.umask(previous)
+    
+    assert stat.S_IMODE(os.stat(tmp_path / 'plan-1.json').st_mode) == 0o644
+    assert os.listdir(tmp_path) == ['plan-1.json']
+
+
+def test_plan_record_round_trips_without_approval():
+    record = make_record()
+    data = record.to_dict()
+    
+    assert 'approved_at' not in data
+    assert PlanRecord.from_dict(data) == record
+
+
+def test_plan_cache_is_bounded_and_reloads_evicted_plans(service):
+    service._plans_cache_size = 2
+    for plan_id in ('plan-1', 'plan-2', 'plan-3'):
+        service._save_plan(plan_id, make_record())
+    
+    assert list(service.plans) == ['plan-2', 'plan-3']
+    assert service._get_record('plan-1') == make_record()
+    assert list(service.plans) == ['plan-3', 'plan-1']
+
+
+def test_plan_changes_from_another_process_are_picked_up(service, tmp_path):
+    other = DevelopmentPlanService()
+    other.data_dir = str(tmp_path)
+    service._save_plan('plan-1', make_record())
+    assert other._get_record('plan-1').status == 'draft'
+    
+    service._save_plan('plan-1', make_record(status='approved'))
+    # Make sure the rewrite is visible even on coarse mtime filesystems
+    stat_result = os.stat(tmp_path / 'plan-1.json')
+    os.utime(tmp_path / 'plan-1.json', ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    
+    assert other._get_record('plan-1').status == 'approved'
@@ -0,0 +1,83 @@
+from services.docker_service import DockerService
+
+
+def make_service(monkeypatch, use_mock=True):
+    service = DockerService()
+    # Skip the Docker SDK probe so the tests never touch a daemon
+    service._client_checked = True
+    service.use_mock = use_mock
+    monkeypatch.setattr(service, '_is_port_available', lambda port: True)
+    return service
+
+
+def test_mock_containers_get_no_expiry_deadline(monkeypatch):
+    service = make_service(monkeypatch)
+    
+    for _ in range(3):
+        service.start_odoo_container("gen-1", "/tmp/stock_alerts_gen-1.zip")
+        service.run_odoo_tests("gen-1")
+    
+    assert service._expiry_heap == []
+
+
+def test_repeated_touches_keep_one_deadline(monkeypatch):
+    service = make_service(monkeypatch, use_mock=False)
+    container_info = {}
+    
+    for _ in range(5):
+        service._touch_container("gen-1", container_info)
+    
+    assert len(service._expiry_heap) == 1
+    assert service._expiry_heap[0][1] == "gen-1"
+
+
+def test_released_ports_are_reused_after_free_ones(monkeypatch):
+    service = make_service(monkeypatch)
+    
+    first = service._find_available_port()
+    second = service._find_available_port()
+    service._release_port(first)
+    
+    assert (first, second) == (service.base_port, service.base_port + 1)
+    assert first not in service._used_ports
+    assert service._free_ports[-1] == first
+    assert service._find_available_port() == service.base_port + 2
+
+
+def test_ports_taken_on_the_host_are_skipped(monkeypatch):
+    service = make_service(monkeypatch)
+    monkeypatch.setattr(service, '_is_port_available', lambda port: port != service.base_port)
+    
+    assert service._find_available_port() == service.base_port + 1
+    assert service._free_ports[-1] == service.base_port
+
+
+def test_die_event_during_start_is_not_overwritten(monkeypatch):
+    service = make_service(monkeypatch, use_mock=False)
+    monkeypatch.setattr(service, '_wait_for_odoo', lambda port: False)
+    
+    class Container:
+        id = "container-1"
+        status = "running"
+        
+        def reload(self):
+            # The event thread records the container dying before the
+            # refreshed status is stored
+            service._container_status[self.id] = 'exited'
+            self.status = 'exited'
+    
+    class Client:
+        class volumes:
+            @staticmethod
+            def create(name):
+                return None
+        
+        class containers:
+            @staticmethod
+            def run(**kwargs):
+                return Container()
+    
+    service.client = Client()
+    service.start_odoo_container("gen-1", "/tmp/stock_alerts_gen-1.zip")
+    
+    assert service._get_container_status("container-1") == 'exited'
@@ -0,0 +1,31 @@
+from services.llm_service import LLMService, ParsedResponse
+
+
+def extract_context(text, current_context=None):
+    # _extract_context only relies on module-level patterns, so skip __init__
+    # and its API client setup
+    service = LLMService.__new__(LLMService)
+    return service._extract_context(ParsedResponse.from_text(text), current_context or {})
+
+
+def test_overlapping_phrases_set_every_context_key():
+    context = extract_context("The module will be called: stock_alerts")
+    
+    assert context["module_name"] == "stock_alerts"
+    assert context["module_purpose"] == "stock_alerts"
+
+
+def test_images_leave_with_their_turns(monkeypatch):
+    monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    monkeypatch.setenv('LLM_HISTORY_MAX_TURNS', '2')
+    service = LLMService()
+    image = {'name': 'form.png', 'type': 'image/png', 'data': 'aW1hZ2U='}
+    
+    conversation_id, conversation, _ = service._start_turn("Here is the form", None, {}, [image])
+    assert len(conversation['images']) == 1
+    
+    service._finish_turn(conversation_id, conversation, conversation['context'], "Noted", {})
+    service._start_turn("And now?", conversation_id, {}, None)
+    
+    assert conversation['images'] == {}
@@ -0,0 +1,44 @@
+import pytest
+from flask import Flask
+
+from api import module_generator
+from services.module_generator_service import ModuleGeneratorService
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = ModuleGeneratorService(str(tmp_path))
+    monkeypatch.setattr(module_generator, 'module_generator_service', service)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def client(service):
+    app = Flask(__name__)
+    app.register_blueprint(module_generator.module_generator_bp, url_prefix='/api/module-generator')
+    return app.test_client()
+
+
+def test_unchanged_status_polls_get_304(service, client):
+    generation_id = service.start_generation('plan-1')
+    service._executor.shutdown(wait=True)
+    
+    first = client.get(f'/api/module-generator/status/{generation_id}')
+    assert first.status_code == 200
+    assert first.get_json()['status'] == 'completed'
+    assert 'plan_id' not in first.get_json()
+    
+    etag = first.headers['ETag']
+    unchanged = client.get(f'/api/module-generator/status/{generation_id}', headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
+    
+    service.get_generation(generation_id).updated_at = '2030-01-01T00:00:00'
+    changed = client.get(f'/api/module-generator/status/{generation_id}', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_unknown_generations_are_404(client):
+    assert client.get('/api/module-generator/status/missing').status_code == 404
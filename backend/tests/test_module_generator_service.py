@@ -0,0 +1,125 @@
+import json
+import os
+import time
+import zipfile
+
+import pytest
+
+from services import module_generator_service
+from services.module_generator_service import Generation, ModuleGeneratorService
+from services.module_templates import render_template
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ModuleGeneratorService(str(tmp_path))
+    yield service
+    service.shutdown()
+
+
+def add_generation(service, generation_id, status='in-progress'):
+    generation = Generation(
+        plan_id='plan-1',
+        status=status,
+        created_at='2024-01-01T00:00:00',
+        updated_at='2024-01-01T00:00:00',
+        progress=[{'id': 1, 'title': 'Initializing Module Generation', 'status': 'in-progress'}],
+        module_name='stock_alerts'
+    )
+    service.generations[generation_id] = generation
+    service._progress_steps[generation_id] = {step['id']: step for step in generation.progress}
+    return generation
+
+
+def saved_data(service, generation_id):
+    with service._db_lock:
+        row = service._db.execute("SELECT data FROM generations WHERE id = ?", (generation_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def test_progress_updates_are_saved_by_the_writer(service):
+    add_generation(service, 'gen-1')
+    
+    service._update_progress('gen-1', 1, 'completed')
+    time.sleep(module_generator_service.GENERATION_SAVE_INTERVAL * 2)
+    
+    assert saved_data(service, 'gen-1')['progress'][0]['status'] == 'completed'
+
+
+def test_unsaveable_generations_are_retried_a_bounded_number_of_times(service, monkeypatch):
+    service.shutdown()
+    attempts = []
+    
+    def fail(generation_id):
+        attempts.append(generation_id)
+        raise ValueError("not serializable")
+    
+    monkeypatch.setattr(service, '_save_generation', fail)
+    service._unsaved_generations.add('gen-1')
+    for _ in range(module_generator_service.GENERATION_SAVE_ATTEMPTS + 2):
+        service._save_unsaved_generations()
+    
+    assert len(attempts) == module_generator_service.GENERATION_SAVE_ATTEMPTS
+    assert not service._unsaved_generations
+
+
+def test_exceptions_escaping_a_generation_are_reported(service, monkeypatch, capsys):
+    def crash(generation_id, plan):
+        raise RuntimeError("worker crashed")
+    
+    monkeypatch.setattr(service, '_generate_module', crash)
+    generation_id = service.start_generation('plan-1')
+    # Done callbacks run on the worker, so they have run once it is joined
+    service._executor.shutdown(wait=True)
+    
+    assert generation_id not in service._futures
+    assert f"Error in generation {generation_id}: worker crashed" in capsys.readouterr().out
+
+
+def test_saved_generations_are_loaded_by_another_instance(service, tmp_path):
+    add_generation(service, 'gen-1', status='completed').module_path = '/tmp/stock_alerts_gen-1.zip'
+    service._save_generation('gen-1')
+    
+    other = ModuleGeneratorService(str(tmp_path))
+    try:
+        assert other.get_module_path('gen-1') == '/tmp/stock_alerts_gen-1.zip'
+        assert 'gen-1' not in other.generations
+        assert other.get_generation_status('gen-1')['status'] == 'completed'
+        assert other.get_generation('missing') is None
+    finally:
+        other.shutdown()
+
+
+def generate(service, plan_id='plan-1'):
+    generation_id = service.start_generation(plan_id)
+    future = service._futures.get(generation_id)
+    if future is not None:
+        future.result(timeout=30)
+    return service.get_generation(generation_id)
+
+
+def test_packages_are_reused_through_hard_links(service):
+    first = generate(service)
+    second = generate(service)
+    
+    assert first.status == second.status == 'completed'
+    assert second.module_path != first.module_path
+    cached_packages = [entry.path for entry in os.scandir(service.cache_dir)]
+    assert len(cached_packages) == 1
+    assert os.path.samefile(second.module_path, cached_packages[0])
+    assert all(step['status'] == 'completed' for step in second.progress)
+
+
+def test_package_holds_the_rendered_module_files(service):
+    generation = generate(service)
+    
+    with zipfile.ZipFile(generation.module_path) as package:
+        names = package.namelist()
+        info = package.getinfo('__manifest__.py')
+        manifest = package.read('__manifest__.py')
+    
+    assert {'__init__.py', '__manifest__.py', 'models/odoo_module.py', 'security/ir.model.access.csv'} <= set(names)
+    assert len(names) == len(set(names))
+    assert info.compress_type == zipfile.ZIP_DEFLATED
+    assert info.external_attr >> 16 == 0o644
+    assert manifest == render_template('manifest', 'odoo_module')